@@ -0,0 +1,50 @@
+import contextlib
+import os
+import sys
+import time
+
+import django
+
+ROOT = os.path.realpath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def setup():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "techtest.settings")
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    django.setup()
+
+
+@contextlib.contextmanager
+def test_database():
+    """A throwaway migrated database, the one the test runner would create"""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def seed(authors=100, regions=50, articles=1000, fanout=3, content_size=500, seed=0):
+    """Generate the synthetic dataset of the seed_data command"""
+    from techtest.article.synthetic import SyntheticData
+
+    SyntheticData(seed=seed, fanout=fanout, content_size=content_size).generate(
+        authors, regions, articles
+    )
+
+
+def best_of(function, repeat=5):
+    """The fastest of the timings of the function, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
@@ -0,0 +1,67 @@
+"""Compare the CPU cost of the response compression levels with the bytes they save
+
+    python -m benchmarks.compression --articles 2000
+"""
+import argparse
+
+from benchmarks.common import best_of, seed, setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup()
+    from django.test.utils import override_settings
+    from techtest.article.models import Article
+    from techtest.article.schemas import ArticleSchema
+    from techtest.utils.cache import get_cache
+    from techtest.utils.compression import brotli, compress, compress_stream
+    from techtest.utils.encoders import get_encoder
+    from techtest.utils.response import iter_json_array
+    from techtest.utils.values import get_values_serializer
+
+    levels = [("gzip", level) for level in (1, 6, 9)]
+    if brotli is not None:
+        levels += [("br", quality) for quality in (1, 5, 9, 11)]
+    with test_database():
+        seed(articles=args.articles)
+        serializer = get_values_serializer(ArticleSchema, Article)
+        data = serializer.dump_many(serializer.values(Article.objects.order_by("pk")))
+        encoder = get_encoder()
+        for size in (100, 1000, len(data)):
+            content = encoder.dumps(data[:size])
+            encoding_time = best_of(lambda: encoder.dumps(data[:size]), args.repeat)
+            print(f"{size:>6} articles  {len(content):>10} bytes  encoding {encoding_time * 1000:7.2f} ms")
+            for encoding, level in levels:
+                with override_settings(COMPRESSION_GZIP_LEVEL=level, COMPRESSION_BROTLI_QUALITY=level):
+                    compressed = compress(content, encoding)
+                    elapsed = best_of(lambda: compress(content, encoding), args.repeat)
+                print(
+                    f"    {encoding:>4} {level:>2}  {len(compressed):>10} bytes"
+                    f"  saved {1 - len(compressed) / len(content):6.1%}  {elapsed * 1000:7.2f} ms"
+                    f"  {len(content) / elapsed / 2 ** 20:7.1f} MiB/s"
+                )
+            get_cache().set("benchmark:compressed", compress(content, "gzip"))
+            cached = best_of(lambda: get_cache().get("benchmark:compressed"), args.repeat)
+            print(f"    cached gzip body read from the response cache {cached * 1000:7.2f} ms")
+
+        # The streamed list, compressed chunk by chunk with a flush per chunk
+        chunks = list(iter_json_array(
+            data[start:start + 500] for start in range(0, len(data), 500)
+        ))
+        whole = b"".join(chunks)
+        for encoding in ("gzip", "br") if brotli is not None else ("gzip",):
+            streamed = b"".join(compress_stream(chunks, encoding))
+            elapsed = best_of(lambda: b"".join(compress_stream(chunks, encoding)), args.repeat)
+            print(
+                f"stream {encoding:>4}  {len(chunks)} chunks  {len(streamed):>10} bytes"
+                f"  vs {len(compress(whole, encoding)):>10} in one go"
+                f"  saved {1 - len(streamed) / len(whole):6.1%}  {elapsed * 1000:7.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
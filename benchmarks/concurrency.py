@@ -0,0 +1,146 @@
+"""Measure the read/write contention of concurrent workers on each database profile
+
+    python -m benchmarks.concurrency --articles 5000 --readers 4 --writers 2 --duration 5
+
+Each profile (DATABASE_PROFILE) is run in its own process, on a temporary
+SQLite file seeded with the synthetic dataset. Reader processes then read
+article list pages while writer processes upsert batches of articles, each
+operation between a request start and end, so the connections are opened,
+kept and checked as they would be by a server. The failed operations are
+the ones that gave up waiting for the database lock.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import seed, setup
+
+PROFILES = ("development", "production")
+
+
+def percentile(timings, percent):
+    if not timings:
+        return 0
+    timings = sorted(timings)
+    return timings[min(len(timings) - 1, int(percent / 100 * len(timings)))]
+
+
+def worker(kind, number, start, deadline, queue):
+    from django.core.signals import request_finished, request_started
+    from django.db import OperationalError
+    from techtest.article.bulk import upsert_articles
+    from techtest.article.models import Article
+    from techtest.article.schemas import ArticleSchema
+    from techtest.utils.values import get_values_serializer
+
+    generator = random.Random(number)
+    serializer = get_values_serializer(ArticleSchema, Article)
+    ids = list(Article.objects.values_list("pk", flat=True))
+    request_finished.send(sender=None)
+    timings = []
+    failures = 0
+    # All the workers start at once, ready
+    time.sleep(max(0, start - time.time()))
+    while time.time() < deadline:
+        request_started.send(sender=None)
+        started = time.perf_counter()
+        try:
+            if kind == "read":
+                first = generator.choice(ids)
+                serializer.dump_many(
+                    serializer.values(Article.objects.filter(pk__gte=first).order_by("pk")[:100])
+                )
+            else:
+                upsert_articles(
+                    [
+                        {"id": pk, "title": f"Written by {number} {generator.random()}"}
+                        for pk in generator.sample(ids, 10)
+                    ],
+                    dump=False,
+                )
+            timings.append(time.perf_counter() - started)
+        except OperationalError:
+            failures += 1
+        finally:
+            request_finished.send(sender=None)
+    queue.put({"kind": kind, "timings": timings, "failures": failures})
+
+
+def run_profile(args):
+    """Seed the database of the profile and run the workers, printing their results as JSON"""
+    import multiprocessing
+
+    setup()
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connections
+
+    call_command("migrate", verbosity=0)
+    seed(articles=args.articles)
+    # The workers open their own connections
+    connections.close_all()
+
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    start = time.time() + 1
+    processes = [
+        context.Process(target=worker, args=(kind, number, start, start + args.duration, queue))
+        for number, kind in enumerate(["read"] * args.readers + ["write"] * args.writers)
+    ]
+    for process in processes:
+        process.start()
+    results = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    summary = {"profile": settings.DATABASE_PROFILE}
+    for kind in ("read", "write"):
+        timings = [timing for result in results if result["kind"] == kind for timing in result["timings"]]
+        summary[kind] = {
+            "per_second": round(len(timings) / args.duration, 1),
+            "p50_ms": round(percentile(timings, 50) * 1000, 2),
+            "p99_ms": round(percentile(timings, 99) * 1000, 2),
+            "failures": sum(result["failures"] for result in results if result["kind"] == kind),
+        }
+    print(json.dumps(summary))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=5000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=5, help="Seconds of the run")
+    parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=list(PROFILES))
+    parser.add_argument("--run-profile", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run_profile:
+        return run_profile(args)
+
+    for profile in args.profiles:
+        with tempfile.TemporaryDirectory() as directory:
+            environ = dict(
+                os.environ,
+                DATABASE_PROFILE=profile,
+                DATABASE_ENGINE="sqlite",
+                SQLITE_PATH=os.path.join(directory, "db.sqlite3"),
+            )
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.concurrency", "--run-profile", *sys.argv[1:]],
+                env=environ, check=True, capture_output=True, text=True,
+            ).stdout
+        summary = json.loads(output.splitlines()[-1])
+        print(f"{profile:>12}", "  ".join(
+            f"{kind}s {summary[kind]['per_second']:8.1f}/s p50 {summary[kind]['p50_ms']:8.2f} ms"
+            f" p99 {summary[kind]['p99_ms']:8.2f} ms failed {summary[kind]['failures']:4}"
+            for kind in ("read", "write")
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Compare the JSON encoders of the responses with the previous str-based encoding
+
+    python -m benchmarks.encoders --articles 2000
+"""
+import argparse
+import json
+
+from benchmarks.common import best_of, seed, setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup()
+    from django.http.response import HttpResponse
+    from techtest.article.models import Article
+    from techtest.article.schemas import ArticleSchema
+    from techtest.utils.encoders import OrjsonEncoder, StdlibJSONEncoder, orjson
+    from techtest.utils.values import get_values_serializer
+
+    encoders = [StdlibJSONEncoder] + ([OrjsonEncoder] if orjson is not None else [])
+    with test_database():
+        seed(articles=args.articles)
+        serializer = get_values_serializer(ArticleSchema, Article)
+        data = serializer.dump_many(serializer.values(Article.objects.order_by("pk")))
+        for size in (100, 1000, len(data)):
+            page = data[:size]
+            previous = best_of(
+                lambda: HttpResponse(json.dumps(page), content_type="application/json"),
+                args.repeat,
+            )
+            timings = []
+            for encoder_class in encoders:
+                encoder = encoder_class()
+                if json.loads(encoder.dumps(page)) != page:
+                    raise SystemExit(f"{encoder_class.__name__}: the document differs")
+                elapsed = best_of(
+                    lambda: HttpResponse(encoder.dumps(page), content_type="application/json"),
+                    args.repeat,
+                )
+                timings.append(
+                    f"  {encoder_class.__name__} {elapsed * 1000:7.2f} ms x{previous / elapsed:.1f}"
+                )
+            print(f"{size:>6} articles  str {previous * 1000:7.2f} ms{''.join(timings)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+"""Benchmark every route of techtest.urls through the test client and the WSGI application
+
+    python -m benchmarks.http --sizes 100 1000 10000 --report report.json
+    python -m benchmarks.http --sizes 100 1000 10000 --baseline report.json
+
+Every scenario runs at every dataset size with two drivers: the Django test
+client, and the WSGI application called directly as a server would call it.
+The report records the latency percentiles, the throughput, the queries of a
+request and its peak Python memory. The scenarios answered with any status
+other than 2xx are reported as failed, and compared with a baseline report,
+the scenarios slower than the tolerance or running more queries are flagged
+as regressions. In both cases the command exits with status 1.
+"""
+import argparse
+import collections
+import io
+import json
+import math
+import platform
+import random
+import sqlite3
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from benchmarks.common import seed, setup, test_database
+
+
+class Scenario:
+    """A request to benchmark, ``prepare(state)`` returns its path and JSON body, if any
+
+    ``prepare`` runs before every request and outside of the timings, so it can
+    create the rows the request deletes.
+    """
+
+    def __init__(self, name, method, prepare):
+        self.name = name
+        self.method = method
+        self.prepare = prepare
+
+
+def scenarios():
+    from django.urls import reverse
+    from techtest.article.models import Article
+    from techtest.article.synthetic import REGION_CODES
+    from techtest.author.models import Author
+    from techtest.region.models import Region
+
+    def free_code():
+        taken = set(Region.objects.values_list("code", flat=True))
+        return next(code for code in REGION_CODES if code not in taken)
+
+    def article_payload(state):
+        return {
+            "title": f"Benchmark article {state['random'].random()}",
+            "content": "Lorem ipsum dolor sit amet",
+            "author": {"id": state["random"].choice(state["author_ids"])},
+            "regions": [{"code": code} for code in state["random"].sample(state["codes"], 2)],
+        }
+
+    def article_path(state):
+        return reverse("article", args=[state["random"].choice(state["article_ids"])])
+
+    def region_path(state):
+        return reverse("region", args=[state["random"].choice(state["region_ids"])])
+
+    def region_update(state):
+        region = Region.objects.get(pk=state["random"].choice(state["region_ids"]))
+        return reverse("region", args=[region.pk]), {"code": region.code, "name": "Renamed"}
+
+    def author_path(state):
+        return reverse("author", args=[state["random"].choice(state["author_ids"])])
+
+    return [
+        Scenario("articles list", "GET", lambda state: (reverse("articles-list"), None)),
+        Scenario("articles list filtered", "GET", lambda state: (
+            f"{reverse('articles-list')}?region={state['random'].choice(state['codes'])}", None
+        )),
+        Scenario("articles list stream", "GET", lambda state: (
+            f"{reverse('articles-list')}?stream=1", None
+        )),
+        Scenario("articles create", "POST", lambda state: (
+            reverse("articles-list"), article_payload(state)
+        )),
+        Scenario("articles bulk", "POST", lambda state: (
+            reverse("articles-bulk"), [article_payload(state) for _ in range(100)]
+        )),
+        Scenario("articles search", "GET", lambda state: (
+            f"{reverse('articles-search')}?q=lorem+ipsum", None
+        )),
+        Scenario("article detail", "GET", lambda state: (article_path(state), None)),
+        Scenario("article update", "PUT", lambda state: (
+            article_path(state), article_payload(state)
+        )),
+        Scenario("article patch", "PATCH", lambda state: (
+            article_path(state), {"title": f"Patched article {state['random'].random()}"}
+        )),
+        Scenario("article delete", "DELETE", lambda state: (
+            reverse("article", args=[Article.objects.create(title="Deleted").pk]), None
+        )),
+        Scenario("regions list", "GET", lambda state: (reverse("regions-list"), None)),
+        Scenario("regions create", "POST", lambda state: (
+            reverse("regions-list"), {"code": free_code(), "name": "Benchmark region"}
+        )),
+        Scenario("region detail", "GET", lambda state: (region_path(state), None)),
+        Scenario("region update", "PUT", region_update),
+        Scenario("region patch", "PATCH", lambda state: (
+            region_path(state), {"name": f"Patched region {state['random'].random()}"}
+        )),
+        Scenario("region delete", "DELETE", lambda state: (
+            reverse("region", args=[Region.objects.create(code=free_code()).pk]), None
+        )),
+        Scenario("authors list", "GET", lambda state: (reverse("author-list"), None)),
+        Scenario("authors create", "POST", lambda state: (reverse("author-list"), {
+            "first_name": "Benchmark", "last_name": str(state["random"].random())[:40]
+        })),
+        Scenario("author detail", "GET", lambda state: (author_path(state), None)),
+        Scenario("author update", "PUT", lambda state: (author_path(state), {
+            "first_name": "Benchmark", "last_name": str(state["random"].random())[:40]
+        })),
+        Scenario("author patch", "PATCH", lambda state: (author_path(state), {
+            "last_name": str(state["random"].random())[:40]
+        })),
+        Scenario("author delete", "DELETE", lambda state: (reverse("author", args=[
+            Author.objects.create(first_name="Benchmark", last_name="Deleted").pk
+        ]), None)),
+        Scenario("metrics", "GET", lambda state: (reverse("metrics"), None)),
+    ]
+
+
+def client_driver():
+    """Send the requests through the test client, returning the status codes"""
+    from django.test import Client
+
+    client = Client(raise_request_exception=False)
+
+    def request(method, path, body):
+        data = json.dumps(body) if body is not None else ""
+        response = client.generic(method, path, data, content_type="application/json")
+        # Iterating consumes the streaming responses too
+        for _ in response:
+            pass
+        response.close()
+        return response.status_code
+
+    return request
+
+
+def wsgi_driver():
+    """Call the WSGI application as a server would, returning the status codes"""
+    from django.core.handlers.wsgi import WSGIHandler
+
+    application = WSGIHandler()
+
+    def request(method, path, body):
+        path, _, query = path.partition("?")
+        data = json.dumps(body).encode() if body is not None else b""
+        environ = {
+            "REQUEST_METHOD": method,
+            "PATH_INFO": path,
+            "QUERY_STRING": query,
+            "SERVER_NAME": "testserver",
+            "SERVER_PORT": "80",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "HTTP_HOST": "testserver",
+            "CONTENT_TYPE": "application/json",
+            "CONTENT_LENGTH": str(len(data)),
+            "wsgi.input": io.BytesIO(data),
+            "wsgi.errors": sys.stderr,
+            "wsgi.url_scheme": "http",
+            "wsgi.version": (1, 0),
+            "wsgi.multithread": False,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        statuses = []
+        result = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+        try:
+            for _ in result:
+                pass
+        finally:
+            result.close()
+        return int(statuses[0].split()[0])
+
+    return request
+
+
+DRIVERS = {"client": client_driver, "wsgi": wsgi_driver}
+
+
+def percentile(timings, percent):
+    """The nearest-rank percentile of the sorted timings"""
+    return timings[max(0, math.ceil(percent / 100 * len(timings)) - 1)]
+
+
+def measure(request, scenario, state, requests, warmup):
+    """The timings, queries and peak memory of the scenario requests"""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    # The statuses of all the requests, the untimed ones included
+    statuses = collections.Counter()
+    for _ in range(warmup):
+        statuses[request(scenario.method, *scenario.prepare(state))] += 1
+
+    timings = []
+    for _ in range(requests):
+        path, body = scenario.prepare(state)
+        start = time.perf_counter()
+        status = request(scenario.method, path, body)
+        timings.append(time.perf_counter() - start)
+        statuses[status] += 1
+
+    # A last request, untimed, to count the queries and trace the allocations
+    path, body = scenario.prepare(state)
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            statuses[request(scenario.method, path, body)] += 1
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "requests": requests,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "p50_ms": round(percentile(timings, 50) * 1000, 3),
+        "p90_ms": round(percentile(timings, 90) * 1000, 3),
+        "p99_ms": round(percentile(timings, 99) * 1000, 3),
+        "mean_ms": round(sum(timings) / len(timings) * 1000, 3),
+        "throughput_rps": round(len(timings) / sum(timings), 1),
+        "queries": len(queries),
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+def run(sizes, drivers, requests, warmup, response_cache):
+    from django.db import connection
+    from django.test.utils import override_settings
+    from techtest.article.models import Article
+    from techtest.author.models import Author
+    from techtest.region.models import Region
+
+    results = []
+    for size in sizes:
+        # Every driver gets the same freshly seeded dataset, the writes of the
+        # previous scenarios would make the next ones read more rows
+        for driver in drivers:
+            with test_database(), override_settings(RESPONSE_CACHE_ENABLED=response_cache):
+                started = time.perf_counter()
+                seed(articles=size)
+                print(f"{size} articles seeded in {time.perf_counter() - started:.1f}s")
+                state = {
+                    "random": random.Random(0),
+                    "article_ids": list(Article.objects.order_by("pk").values_list("pk", flat=True)),
+                    "author_ids": list(Author.objects.order_by("pk").values_list("pk", flat=True)),
+                    "region_ids": list(Region.objects.order_by("pk").values_list("pk", flat=True)),
+                    "codes": list(Region.objects.order_by("pk").values_list("code", flat=True)),
+                }
+                request = DRIVERS[driver]()
+                for scenario in scenarios():
+                    result = {
+                        "size": size,
+                        "driver": driver,
+                        "scenario": scenario.name,
+                        **measure(request, scenario, state, requests, warmup),
+                    }
+                    results.append(result)
+                    print(format_result(result))
+                connection.close()
+    return results
+
+
+def format_result(result, baseline=None):
+    line = (
+        f"{result['size']:>7} {result['driver']:<6} {result['scenario']:<24}"
+        f" p50 {result['p50_ms']:8.2f} ms  p90 {result['p90_ms']:8.2f} ms"
+        f"  p99 {result['p99_ms']:8.2f} ms  {result['throughput_rps']:8.1f} req/s"
+        f"  {result['queries']:3} queries  {result['peak_memory_kb']:9.1f} KiB"
+        f"  {' '.join(f'{status}x{count}' for status, count in result['statuses'].items())}"
+    )
+    if baseline is not None:
+        line += f"  p50 x{result['p50_ms'] / max(baseline['p50_ms'], 1e-3):.2f}"
+    return line
+
+
+def failures(results):
+    """The results with responses other than 2xx"""
+    return [
+        result for result in results
+        if any(not status.startswith("2") for status in result["statuses"])
+    ]
+
+
+def regressions(results, baseline, tolerance, min_delta):
+    """The results slower than the baseline ones by more than the tolerance, or running more queries
+
+    The p50 latency has to grow by ``min_delta`` milliseconds at least, as the
+    sub-millisecond requests vary by more than the tolerance from run to run.
+    """
+    previous = {
+        (result["size"], result["driver"], result["scenario"]): result
+        for result in baseline["results"]
+    }
+    found = []
+    for result in results:
+        base = previous.get((result["size"], result["driver"], result["scenario"]))
+        if base is None:
+            continue
+        reasons = []
+        if result["p50_ms"] > max(base["p50_ms"] * (1 + tolerance), base["p50_ms"] + min_delta):
+            reasons.append(f"p50 {base['p50_ms']:.2f} -> {result['p50_ms']:.2f} ms")
+        if result["queries"] > base["queries"]:
+            reasons.append(f"queries {base['queries']} -> {result['queries']}")
+        if reasons:
+            found.append((result, base, reasons))
+    return found
+
+
+def environment():
+    import django
+
+    return {
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000],
+                        help="Numbers of articles of the datasets")
+    parser.add_argument("--drivers", nargs="+", choices=DRIVERS, default=list(DRIVERS))
+    parser.add_argument("--requests", type=int, default=30, help="Timed requests per scenario")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed requests per scenario")
+    parser.add_argument("--response-cache", action="store_true",
+                        help="Serve the GET requests from the response cache")
+    parser.add_argument("--report", help="Write the JSON report to this path")
+    parser.add_argument("--baseline", help="Compare with the JSON report at this path")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Slowdown of the p50 latency flagged as a regression")
+    parser.add_argument("--min-delta", type=float, default=0.5,
+                        help="Smallest growth of the p50 latency flagged, in milliseconds")
+    args = parser.parse_args()
+    if args.requests < 1:
+        parser.error("--requests must be positive")
+
+    setup()
+    results = run(args.sizes, args.drivers, args.requests, args.warmup, args.response_cache)
+    report = {"environment": environment(), "options": vars(args), "results": results}
+    if args.report:
+        with open(args.report, "w") as output:
+            json.dump(report, output, indent=2)
+        print(f"Report written to {args.report}")
+
+    failed = failures(results)
+    for result in failed:
+        print(f"FAILED {format_result(result)}")
+    found = []
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        found = regressions(results, baseline, args.tolerance, args.min_delta)
+        for result, base, reasons in found:
+            print(f"REGRESSION {format_result(result, base)}  ({', '.join(reasons)})")
+        if not found:
+            print(f"No regression against {args.baseline}")
+    if failed or found:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Compare the compiled serializers with the marshmallow schemas dump, and
+the values() list reads with the model instances ones
+
+    python -m benchmarks.serializers --articles 2000
+"""
+import argparse
+
+from benchmarks.common import best_of, seed, setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup()
+    from techtest.article.models import Article
+    from techtest.article.schemas import ArticleSchema
+    from techtest.author.models import Author
+    from techtest.author.schemas import AuthorSchema
+    from techtest.region.models import Region
+    from techtest.region.schemas import RegionSchema
+    from techtest.utils.queryset import plan_queryset
+    from techtest.utils.serializers import get_serializer
+    from techtest.utils.values import get_values_serializer
+
+    with test_database():
+        seed(articles=args.articles)
+        for schema, model in (
+            (ArticleSchema, Article), (AuthorSchema, Author), (RegionSchema, Region)
+        ):
+            objs = list(plan_queryset(model.objects.all(), schema))
+            serializer = get_serializer(schema)
+            if serializer.dump_many(objs) != schema().dump(objs, many=True):
+                raise SystemExit(f"{schema.__name__}: the compiled output differs")
+            marshmallow = best_of(lambda: schema().dump(objs, many=True), args.repeat)
+            compiled = best_of(lambda: serializer.dump_many(objs), args.repeat)
+            print(
+                f"{schema.__name__:>14} x{len(objs):<6} marshmallow {marshmallow * 1000:8.2f} ms"
+                f"  compiled {compiled * 1000:8.2f} ms  speedup x{marshmallow / compiled:.1f}"
+            )
+
+        for schema, model in ((ArticleSchema, Article), (AuthorSchema, Author)):
+            queryset = plan_queryset(model.objects.order_by("pk"), schema)
+            serializer = get_serializer(schema)
+            values_serializer = get_values_serializer(schema, model)
+            if serializer.dump_many(queryset) != values_serializer.dump_many(
+                values_serializer.values(queryset)
+            ):
+                raise SystemExit(f"{schema.__name__}: the values() output differs")
+            instances = best_of(lambda: serializer.dump_many(queryset.all()), args.repeat)
+            values = best_of(
+                lambda: values_serializer.dump_many(values_serializer.values(queryset)),
+                args.repeat,
+            )
+            print(
+                f"{model.__name__:>14} list  instances {instances * 1000:8.2f} ms"
+                f"  values {values * 1000:8.2f} ms  speedup x{instances / values:.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
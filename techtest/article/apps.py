@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ArticlesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'techtest.article'
+
+    def ready(self):
+        from techtest.article import documents  # noqa: F401 connects the read model signals
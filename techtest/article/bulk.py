@@ -0,0 +1,189 @@
+from marshmallow import validate
+from marshmallow import fields
+from marshmallow import Schema
+from marshmallow.decorators import validates_schema
+from marshmallow.exceptions import ValidationError
+from django.db import transaction
+
+from techtest.article.documents import batch_refreshes, refresh_documents
+from techtest.article.models import Article
+from techtest.article.schemas import ArticleSchema, set_regions
+from techtest.author.schemas import create_authors, resolve_authors
+from techtest.region.schemas import create_regions, resolve_regions
+from techtest.utils.cache import invalidate_responses
+from techtest.utils.queryset import bulk_create_with_pks, plan_queryset
+from techtest.utils.serializers import get_serializer
+
+
+class AuthorReferenceSchema(Schema):
+    id = fields.Integer()
+    first_name = fields.String(validate=validate.Length(max=40))
+    last_name = fields.String(validate=validate.Length(max=40))
+
+    @validates_schema
+    def validate_reference(self, data, **kwargs):
+        if "id" not in data and ("first_name" not in data or "last_name" not in data):
+            raise ValidationError("Either the id or the first and last names are required")
+
+
+class RegionReferenceSchema(Schema):
+    id = fields.Integer()
+    code = fields.String(validate=validate.Length(equal=2))
+    name = fields.String(validate=validate.Length(max=255))
+
+    @validates_schema
+    def validate_reference(self, data, **kwargs):
+        if "id" not in data and "code" not in data:
+            raise ValidationError("Either the id or the code is required")
+
+
+class ArticleBulkItemSchema(Schema):
+    """Validation of a single article of a bulk upsert, without database access"""
+
+    id = fields.Integer()
+    title = fields.String(validate=validate.Length(max=255))
+    content = fields.String()
+    author = fields.Nested(AuthorReferenceSchema, allow_none=True)
+    regions = fields.List(fields.Nested(RegionReferenceSchema))
+
+
+def upsert_articles(payloads, dump=True):
+    """Create or update the articles of the payloads in a single transaction
+
+    The payloads are validated first, then the authors and the regions they
+    reference are resolved with a single lookup each, and the articles and
+    their region links are written with bulk inserts and updates. Returns the
+    per-payload results, in the order of the payloads: the HTTP-like status
+    and either the serialized article (only its id unless ``dump``) or the
+    validation errors.
+    """
+    results = [None] * len(payloads)
+    items = {}
+    schema = ArticleBulkItemSchema()
+    seen_ids = set()
+    for index, payload in enumerate(payloads):
+        try:
+            item = schema.load(payload)
+        except ValidationError as e:
+            results[index] = {"status": 400, "errors": e.messages}
+            continue
+        if "id" in item:
+            if item["id"] in seen_ids:
+                results[index] = {"status": 400, "errors": {"id": ["Duplicate article id"]}}
+                continue
+            seen_ids.add(item["id"])
+        items[index] = item
+
+    with transaction.atomic(), batch_refreshes():
+        resolve_references(items, results)
+        existing = Article.objects.in_bulk(
+            [item["id"] for item in items.values() if "id" in item]
+        )
+        created, updated = [], []
+        articles = {}
+        for index, item in items.items():
+            article = existing.get(item.get("id"))
+            if article is None:
+                article = Article(id=item.get("id"))
+                created.append(article)
+            else:
+                updated.append(article)
+            for field in ("title", "content", "author"):
+                if field in item:
+                    setattr(article, field, item[field])
+            articles[index] = article
+
+        bulk_create_with_pks(Article, created)
+        if updated:
+            Article.objects.bulk_update(updated, ["title", "content", "author"])
+        if articles:
+            invalidate_responses(Article)
+            refresh_documents([article.pk for article in articles.values()])
+        set_regions(
+            {
+                articles[index]: item["regions"]
+                for index, item in items.items() if "regions" in item
+            },
+            existing=[article.pk for article in updated],
+        )
+
+    if dump:
+        dumped = {
+            article["id"]: article
+            for article in get_serializer(ArticleSchema).dump_many(
+                plan_queryset(
+                    Article.objects.filter(pk__in=[a.pk for a in articles.values()]),
+                    ArticleSchema,
+                )
+            )
+        }
+    else:
+        dumped = {article.pk: {"id": article.pk} for article in articles.values()}
+    created = {article.pk for article in created}
+    for index, article in articles.items():
+        results[index] = {
+            "status": 201 if article.pk in created else 200,
+            "data": dumped[article.pk],
+        }
+    return results
+
+
+def resolve_references(items, results):
+    """Replace the author and region references of the items with instances
+
+    The items with a reference that cannot be resolved are removed from the
+    items and get their errors in the results. They are found before anything
+    is created, so the authors and regions they reference are not.
+    """
+    references = lookup_references(items)
+    for index, (author, regions) in list(references.items()):
+        item = items[index]
+        errors = {}
+        if item.get("author") and author is None:
+            errors["author"] = ["The author does not exist"]
+        missing = {
+            position: ["The region does not exist"]
+            for position, region in enumerate(regions) if region is None
+        }
+        if missing:
+            errors["regions"] = missing
+        if errors:
+            results[index] = {"status": 400, "errors": errors}
+            del items[index]
+            del references[index]
+
+    # The references of the remaining items that are still to create, once each
+    authors = {
+        id(author): author for author, _ in references.values()
+        if author is not None and author.pk is None
+    }
+    regions = {
+        id(region): region for _, linked in references.values()
+        for region in linked if region.pk is None
+    }
+    if authors:
+        create_authors(authors.values())
+    if regions:
+        create_regions(regions.values())
+    for index, (author, regions) in references.items():
+        if items[index].get("author"):
+            items[index]["author"] = author
+        if "regions" in items[index]:
+            items[index]["regions"] = regions
+
+
+def lookup_references(items):
+    """The author and the regions referenced by each item, by item index, the new ones unsaved"""
+    authors = iter(resolve_authors(
+        [item["author"] for item in items.values() if item.get("author")], create=False
+    ))
+    regions = iter(resolve_regions(
+        [region for item in items.values() for region in item.get("regions", [])], create=False
+    ))
+    return {
+        index: (
+            next(authors) if item.get("author") else None,
+            [next(regions) for _ in item.get("regions", [])],
+        )
+        for index, item in items.items()
+    }
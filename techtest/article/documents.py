@@ -0,0 +1,203 @@
+import contextlib
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.http.response import HttpResponse
+
+from techtest.article.models import Article, ArticleDocument
+from techtest.author.models import Author
+from techtest.region.cache import region_cache
+from techtest.region.models import Region
+from techtest.utils.encoders import get_encoder
+from techtest.utils.fieldsets import FieldsetError
+from techtest.utils.filters import filter_queryset
+from techtest.utils.replicas import read_from_primary
+
+_batch = threading.local()
+
+
+def render_documents(article_ids):
+    """The JSON documents of the existing articles among the ids, by article id
+
+    The regions are read from the database rather than from the region
+    catalogue cache: a stale catalogue would be stored in the documents until
+    their articles are written again.
+    """
+    from techtest.article.schemas import ArticleSchema
+    from techtest.utils.values import get_values_serializer
+
+    serializer = get_values_serializer(ArticleSchema, Article, use_cache=False)
+    encoder = get_encoder()
+    return {
+        article["id"]: encoder.dumps(article).decode()
+        for article in serializer.dump_many(
+            serializer.values(Article.objects.filter(pk__in=article_ids))
+        )
+    }
+
+
+def store_documents(article_ids):
+    """Render and store the documents of the articles, returning them by article id"""
+    with read_from_primary():
+        documents = render_documents(set(article_ids))
+    with transaction.atomic():
+        existing = set(
+            ArticleDocument.objects.filter(article_id__in=documents).values_list("pk", flat=True)
+        )
+        ArticleDocument.objects.bulk_update(
+            [ArticleDocument(article_id=pk, document=documents[pk]) for pk in existing],
+            ["document"],
+            batch_size=500,
+        )
+        ArticleDocument.objects.bulk_create(
+            [
+                ArticleDocument(article_id=pk, document=document)
+                for pk, document in documents.items() if pk not in existing
+            ],
+            batch_size=500,
+        )
+    return documents
+
+
+def refresh_documents(article_ids):
+    """Render again and store the documents of the changed articles, returning them by article id
+
+    Inside ``batch_refreshes`` the articles are only recorded, to be rendered
+    once at the end of the block. Does nothing unless the read model is
+    enabled with ``ARTICLE_DOCUMENTS_ENABLED``.
+    """
+    if not settings.ARTICLE_DOCUMENTS_ENABLED:
+        return {}
+    pending = getattr(_batch, "article_ids", None)
+    if pending is not None:
+        pending.update(article_ids)
+        return {}
+    return store_documents(article_ids)
+
+
+@contextlib.contextmanager
+def batch_refreshes():
+    """Refresh the documents of all the articles changed inside the block at once, at its end"""
+    if getattr(_batch, "article_ids", None) is not None:
+        yield
+        return
+    _batch.article_ids = set()
+    try:
+        yield
+    except BaseException:
+        _batch.article_ids = None
+        raise
+    article_ids, _batch.article_ids = _batch.article_ids, None
+    refresh_documents(article_ids)
+
+
+def rebuild_documents(batch_size=500):
+    """Render again the documents of all the articles, returning their number"""
+    ArticleDocument.objects.all().delete()
+    article_ids = Article.objects.order_by("pk").values_list("pk", flat=True)
+    count = 0
+    batch = list(article_ids[:batch_size])
+    while batch:
+        store_documents(batch)
+        count += len(batch)
+        batch = list(article_ids.filter(pk__gt=batch[-1])[:batch_size])
+    return count
+
+
+def serves_documents(view):
+    """Whether the view serves the full documents of the read model to its request"""
+    if not settings.ARTICLE_DOCUMENTS_ENABLED:
+        return False
+    try:
+        fieldset = view.get_fieldset()
+    except FieldsetError:
+        # Answered by the view itself
+        return False
+    return fieldset is None and view.request.GET.get("stream") not in ("1", "true")
+
+
+def documents_response(documents):
+    return HttpResponse(content=documents, content_type="application/json")
+
+
+class ArticleDocumentListMixin:
+    """Serve the pages of the full article list from the read model"""
+
+    def get_list_queryset(self):
+        if not serves_documents(self):
+            return super().get_list_queryset()
+        queryset = self.get_queryset().select_related(None).prefetch_related(None)
+        return filter_queryset(queryset, self.filters, self.request.GET).values(
+            "id", "document__document"
+        )
+
+    def page_response(self, page):
+        if not serves_documents(self):
+            return super().page_response(page)
+        documents = {row["id"]: row["document__document"] for row in page.object_list}
+        # The articles written without signals (queryset updates) and not rebuilt yet
+        missing = [pk for pk, document in documents.items() if document is None]
+        if missing:
+            documents.update(refresh_documents(missing))
+        return documents_response(f"[{','.join(documents.values())}]")
+
+
+class ArticleDocumentMixin:
+    """Serve the full single articles from the read model"""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method == "GET" and serves_documents(self):
+            document = ArticleDocument.objects.filter(
+                article_id=kwargs[self.pk_url_kwarg]
+            ).values_list("document", flat=True).first()
+            if document is not None:
+                return documents_response(document)
+        return super().dispatch(request, *args, **kwargs)
+
+
+@receiver(post_save, sender=Article)
+def refresh_article(instance, **kwargs):
+    refresh_documents([instance.pk])
+
+
+@receiver(post_save, sender=Author)
+def refresh_author_articles(instance, created, **kwargs):
+    if not created:
+        refresh_documents(instance.article_list.values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Region)
+def record_region_articles(instance, **kwargs):
+    # The links are gone once the region is deleted
+    if settings.ARTICLE_DOCUMENTS_ENABLED:
+        instance._document_article_ids = list(instance.articles.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Region)
+@receiver(post_delete, sender=Region)
+def refresh_region_articles(instance, **kwargs):
+    if not settings.ARTICLE_DOCUMENTS_ENABLED:
+        return
+    # The catalogue would only be invalidated by the receivers of the region app
+    # after this one
+    region_cache.invalidate()
+    article_ids = getattr(instance, "_document_article_ids", None)
+    if article_ids is None:
+        article_ids = instance.articles.values_list("pk", flat=True)
+    refresh_documents(article_ids)
+
+
+@receiver(m2m_changed, sender=Article.regions.through)
+def refresh_linked_articles(instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            refresh_documents([instance.pk])
+    elif action == "pre_clear" and settings.ARTICLE_DOCUMENTS_ENABLED:
+        instance._document_article_ids = list(instance.articles.values_list("pk", flat=True))
+    elif action == "post_clear":
+        refresh_documents(getattr(instance, "_document_article_ids", ()))
+    elif action in ("post_add", "post_remove"):
+        refresh_documents(pk_set)
@@ -0,0 +1,66 @@
+import contextlib
+import gzip
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from techtest.article.models import Article
+from techtest.article.schemas import ArticleSchema
+from techtest.utils.encoders import get_encoder
+from techtest.utils.queryset import iter_batches
+from techtest.utils.values import get_values_serializer
+
+
+def open_output(path, compressed):
+    if path == "-":
+        # The standard output is left open
+        stream = contextlib.nullcontext(sys.stdout.buffer)
+        return gzip.open(sys.stdout.buffer, "wb") if compressed else stream
+    return gzip.open(path, "wb") if compressed else open(path, "wb")
+
+
+class Command(BaseCommand):
+    help = (
+        "Write all the articles to a JSON Lines file, one article per line in the format "
+        "of the API, gzipped when the file name ends with .gz"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="The JSON Lines file, - for the standard output")
+        parser.add_argument(
+            "--chunk-size", type=int, default=None,
+            help="Articles read per query, STREAM_CHUNK_SIZE by default",
+        )
+        parser.add_argument(
+            "--gzip", action="store_true", help="Write the file as gzip whatever its name"
+        )
+
+    def handle(self, *args, path, chunk_size, **options):
+        chunk_size = chunk_size or settings.STREAM_CHUNK_SIZE
+        if chunk_size < 1:
+            raise CommandError("The chunk size must be positive")
+        compressed = options["gzip"] or path.endswith(".gz")
+        serializer = get_values_serializer(ArticleSchema, Article)
+        encoder = get_encoder()
+        started = time.monotonic()
+        count = 0
+        try:
+            stream = open_output(path, compressed)
+        except OSError as e:
+            raise CommandError(e)
+        with stream as output:
+            # The rows are read from a single cursor and serialized chunk by chunk
+            for batch in iter_batches(serializer.values(Article.objects.all()), chunk_size):
+                output.write(b"".join(
+                    encoder.dumps(article) + b"\n" for article in serializer.dump_many(batch)
+                ))
+                count += len(batch)
+        elapsed = time.monotonic() - started
+        # The summary goes to the standard error when the articles go to the standard output
+        report = self.stderr if path == "-" else self.stdout
+        report.write(self.style.SUCCESS(
+            f"Exported {count} articles in {elapsed:.1f}s "
+            f"({count / max(elapsed, 1e-9):.0f} rows/s)"
+        ))
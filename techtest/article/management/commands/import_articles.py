@@ -0,0 +1,78 @@
+import contextlib
+import gzip
+import itertools
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from techtest.article.bulk import upsert_articles
+
+
+def open_input(path, compressed):
+    if path == "-":
+        # The standard input is left open
+        stream = contextlib.nullcontext(sys.stdin.buffer)
+        return gzip.open(sys.stdin.buffer) if compressed else stream
+    return gzip.open(path, "rb") if compressed else open(path, "rb")
+
+
+class Command(BaseCommand):
+    help = (
+        "Create or update articles from a JSON Lines file, one article per line in the "
+        "format of the bulk endpoint, gzipped when the file name ends with .gz"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="The JSON Lines file, - for the standard input")
+        parser.add_argument(
+            "--chunk-size", type=int, default=1000,
+            help="Articles written per transaction",
+        )
+        parser.add_argument(
+            "--gzip", action="store_true", help="Read the file as gzip whatever its name"
+        )
+
+    def handle(self, *args, path, chunk_size, **options):
+        if chunk_size < 1:
+            raise CommandError("The chunk size must be positive")
+        compressed = options["gzip"] or path.endswith(".gz")
+        started = time.monotonic()
+        written = failed = 0
+        try:
+            stream = open_input(path, compressed)
+        except OSError as e:
+            raise CommandError(e)
+        with stream as lines:
+            numbered = enumerate(lines, start=1)
+            while True:
+                chunk = list(itertools.islice(numbered, chunk_size))
+                if not chunk:
+                    break
+                payloads, numbers = [], []
+                for number, line in chunk:
+                    if not line.strip():
+                        continue
+                    try:
+                        payloads.append(json.loads(line))
+                    except ValueError as e:
+                        failed += 1
+                        self.stderr.write(f"Line {number}: invalid JSON, {e}")
+                        continue
+                    numbers.append(number)
+                # Each chunk is written in its own transaction
+                for number, result in zip(numbers, upsert_articles(payloads, dump=False)):
+                    if result["status"] == 400:
+                        failed += 1
+                        self.stderr.write(f"Line {number}: {json.dumps(result['errors'])}")
+                    else:
+                        written += 1
+                if options["verbosity"] > 1:
+                    self.stdout.write(f"{written} articles written")
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {written} articles in {elapsed:.1f}s "
+            f"({written / max(elapsed, 1e-9):.0f} rows/s), {failed} failed"
+        ))
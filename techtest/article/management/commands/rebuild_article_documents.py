@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from techtest.article.documents import rebuild_documents
+
+
+class Command(BaseCommand):
+    help = "Render again the documents of the article read model"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=500, help="Articles rendered per batch"
+        )
+
+    def handle(self, *args, batch_size, **options):
+        with transaction.atomic():
+            count = rebuild_documents(batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the documents of {count} articles"))
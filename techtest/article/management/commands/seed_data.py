@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from techtest.article.synthetic import CONTENT_DISTRIBUTIONS, SyntheticData, rate_reporter
+
+
+class Command(BaseCommand):
+    help = "Generate deterministic synthetic authors, regions and articles with bulk inserts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--authors", type=int, default=100)
+        parser.add_argument("--regions", type=int, default=50, help="At most 676 in total")
+        parser.add_argument("--articles", type=int, default=1000)
+        parser.add_argument("--fanout", type=int, default=3, help="Regions per article")
+        parser.add_argument(
+            "--content-size", type=int, default=500, help="Average article content size"
+        )
+        parser.add_argument(
+            "--content-distribution", choices=CONTENT_DISTRIBUTIONS, default="fixed"
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the random generator")
+        parser.add_argument(
+            "--chunk-size", type=int, default=10000, help="Articles inserted per transaction"
+        )
+
+    def handle(self, *args, **options):
+        for option in ("authors", "regions", "articles", "fanout", "content_size"):
+            if options[option] < 0:
+                raise CommandError(f"--{option.replace('_', '-')} cannot be negative")
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive")
+
+        started = time.monotonic()
+        data = SyntheticData(
+            seed=options["seed"],
+            fanout=options["fanout"],
+            content_size=options["content_size"],
+            content_distribution=options["content_distribution"],
+        )
+        try:
+            data.generate(
+                options["authors"],
+                options["regions"],
+                options["articles"],
+                options["chunk_size"],
+                rate_reporter(self.stdout.write, options["articles"]),
+            )
+        except ValueError as e:
+            raise CommandError(e)
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {options['authors']} authors, {options['regions']} regions and "
+            f"{options['articles']} articles in {time.monotonic() - started:.1f}s"
+        ))
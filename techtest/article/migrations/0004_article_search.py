@@ -0,0 +1,76 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+# External-content FTS5 index of the articles title and content, ranked with
+# BM25 weighting a title match as ten content matches, and kept in sync by
+# triggers on the articles table. Without SQLite FTS5 the search falls back
+# to an in-process index, see techtest.article.search.
+# The SQLite schema editor remakes a table to alter most of its columns,
+# dropping its triggers: such a migration of the articles must recreate them.
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE article_search USING fts5(
+        title, content, content='article_article', content_rowid='id'
+    )
+    """,
+    "INSERT INTO article_search(article_search, rank) VALUES ('rank', 'bm25(10.0, 1.0)')",
+    """
+    CREATE TRIGGER article_search_insert AFTER INSERT ON article_article BEGIN
+        INSERT INTO article_search(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER article_search_delete AFTER DELETE ON article_article BEGIN
+        INSERT INTO article_search(article_search, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER article_search_update AFTER UPDATE OF title, content ON article_article BEGIN
+        INSERT INTO article_search(article_search, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO article_search(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+    "INSERT INTO article_search(article_search) VALUES ('rebuild')",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS article_search_insert",
+    "DROP TRIGGER IF EXISTS article_search_delete",
+    "DROP TRIGGER IF EXISTS article_search_update",
+    "DROP TABLE IF EXISTS article_search",
+]
+
+
+def create_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE article_search_probe USING fts5(probe)")
+        except OperationalError:
+            # SQLite built without FTS5
+            return
+        cursor.execute("DROP TABLE article_search_probe")
+    for sql in CREATE_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        for sql in DROP_SQL:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article', '0003_alter_article_author'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.7 on 2026-10-18 08:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('author', '0003_list_filter_indexes'),
+        ('article', '0004_article_search'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='article',
+            name='author',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='article_list', to='author.author'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['title'], name='article_title_idx'),
+        ),
+        # The auto-created through model has no Meta to declare indexes in: the
+        # articles of a region are read from this index alone
+        migrations.RunSQL(
+            'CREATE INDEX "article_regions_region_article_idx" '
+            'ON "article_article_regions" ("region_id", "article_id")',
+            'DROP INDEX "article_regions_region_article_idx"',
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.7 on 2026-10-18 08:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article', '0005_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleDocument',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='document', serialize=False, to='article.article')),
+                ('document', models.TextField()),
+            ],
+        ),
+    ]
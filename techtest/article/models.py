@@ -17,5 +17,17 @@ class Article(models.Model):
         related_name="article_list"
     )
 
+    class Meta:
+        indexes = [models.Index(fields=["title"], name="article_title_idx")]
+
     def __str__(self):
         return f"<Book id={self.id} : title={self.title}>"
+
+
+class ArticleDocument(models.Model):
+    """The serialized document of an article, maintained by techtest.article.documents"""
+
+    article = models.OneToOneField(
+        Article, on_delete=models.CASCADE, primary_key=True, related_name="document"
+    )
+    document = models.TextField()
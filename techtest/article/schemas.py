@@ -1,19 +1,31 @@
+from collections import defaultdict
 
 from marshmallow import validate
 from marshmallow import fields
 from marshmallow import Schema
 from marshmallow.decorators import post_load
 from marshmallow.exceptions import ValidationError
+from django.db import router
+from django.db.models.signals import m2m_changed
 
+from techtest.article.documents import batch_refreshes
 from techtest.article.models import Article
 from techtest.author.models import Author
+from techtest.author.schemas import AuthorSchema
+from techtest.region.cache import region_cache
 from techtest.region.models import Region
-from techtest.region.schemas import RegionSchema
+from techtest.region.schemas import RegionSchema, resolve_regions
+from techtest.utils.queryset import update_instance
+from techtest.utils.serializers import get_serializer
+
+author_serializer = get_serializer(AuthorSchema)
 
 
 class ArticleSchema(Schema):
     class Meta(object):
         model = Article
+        select_related = {"author": AuthorSchema}
+        prefetch_related = {"regions": RegionSchema}
 
     id = fields.Integer()
     title = fields.String(validate=validate.Length(max=255))
@@ -27,32 +39,118 @@ class ArticleSchema(Schema):
     )
 
     def get_regions(self, article):
-        return RegionSchema().dump(article.regions.all(), many=True)
+        # The prefetched regions are read from the prefetch cache directly, as
+        # building the related manager costs more than serializing the regions
+        regions = getattr(article, "_prefetched_objects_cache", {}).get("regions")
+        if regions is None:
+            regions = article.regions.all()
+        return region_cache.dump([region.pk for region in regions])
 
     def load_regions(self, regions):
-        return [
-            Region.objects.get_or_create(id=region.pop("id", None), defaults=region)[0]
-            for region in regions
-        ]
+        resolved = resolve_regions(regions)
+        missing = {
+            position: ["The region does not exist"]
+            for position, region in enumerate(resolved) if region is None
+        }
+        if missing:
+            raise ValidationError(missing)
+        return resolved
 
     def get_author(self, article):
-        from techtest.author.schemas import AuthorSchema
         author = article.author
         if not author:
             return None
-        return AuthorSchema().dump(article.author)
+        return author_serializer.dump(article.author)
 
     def load_author(self, author):
+        # The author the updated article was loaded with is reused as is
+        instance = self.context.get("instance")
+        if instance is not None and Article.author.is_cached(instance):
+            loaded = instance.author
+            if loaded is not None and author.get("id", loaded.pk) == loaded.pk and all(
+                getattr(loaded, name) == value for name, value in author.items() if name != "id"
+            ):
+                return loaded
         author_id = author.pop("id", None)
         author, _ = Author.objects.get_or_create(id=author_id, **author)
         return author
 
     @post_load
     def update_or_create(self, data, *args, **kwargs):
+        """Update the article of the ``instance`` context in place, or create or update by id"""
         regions = data.pop("regions", None)
-        article, _ = Article.objects.update_or_create(
-            id=data.pop("id", None), defaults=data
-        )
-        if isinstance(regions, list):
-            article.regions.set(regions)
+        instance = self.context.get("instance")
+        with batch_refreshes():
+            if instance is not None:
+                data.pop("id", None)
+                update_instance(instance, data)
+                if isinstance(regions, list):
+                    update_regions(instance, regions)
+                return instance
+            article, created = Article.objects.update_or_create(
+                id=data.pop("id", None), defaults=data
+            )
+            if isinstance(regions, list):
+                set_regions({article: regions}, existing=[] if created else [article.pk])
         return article
+
+
+def update_regions(article, regions):
+    """Set the regions of the loaded article, with no query when they did not change
+
+    The regions are then cached on the article as if prefetched, so the
+    article is serialized without reading them again.
+    """
+    prefetched = getattr(article, "_prefetched_objects_cache", {}).get("regions")
+    if prefetched is None or {region.pk for region in prefetched} != {region.pk for region in regions}:
+        set_regions({article: regions}, existing=[article.pk])
+    article.__dict__.setdefault("_prefetched_objects_cache", {}).pop("regions", None)
+    queryset = article.regions.all()
+    queryset._result_cache = sorted({region.pk: region for region in regions}.values(), key=lambda region: region.pk)
+    queryset._prefetch_done = True
+    article._prefetched_objects_cache["regions"] = queryset
+
+
+def set_regions(article_regions, existing=()):
+    """Set the regions of the articles with a single bulk insert and delete
+
+    Unlike ``article.regions.set()``, the links of all the articles are
+    diffed at once in memory and unchanged links cost no write. ``existing``
+    are the ids of the articles that may already have region links.
+    """
+    through = Article.regions.through
+    wanted = {
+        (article.pk, region.pk)
+        for article, regions in article_regions.items() for region in regions
+    }
+    current = {}
+    existing = set(existing)
+    targets = [article.pk for article in article_regions if article.pk in existing]
+    if targets:
+        current = {
+            (article_id, region_id): link_id
+            for link_id, article_id, region_id in through.objects.filter(
+                article_id__in=targets
+            ).values_list("id", "article_id", "region_id")
+        }
+    stale = {link: link_id for link, link_id in current.items() if link not in wanted}
+    if stale:
+        through.objects.filter(id__in=stale.values()).delete()
+    added = wanted - current.keys()
+    through.objects.bulk_create(
+        through(article_id=article_id, region_id=region_id)
+        for article_id, region_id in added
+    )
+    # The links are written on the through table directly, the signals
+    # Article.regions.add() and remove() would send are sent here
+    articles = {article.pk: article for article in article_regions}
+    using = router.db_for_write(through)
+    for action, links in (("post_remove", stale), ("post_add", added)):
+        pk_sets = defaultdict(set)
+        for article_id, region_id in links:
+            pk_sets[article_id].add(region_id)
+        for article_id, pk_set in pk_sets.items():
+            m2m_changed.send(
+                sender=through, instance=articles[article_id], action=action,
+                reverse=False, model=Region, pk_set=pk_set, using=using,
+            )
@@ -0,0 +1,172 @@
+import math
+import re
+import threading
+import unicodedata
+
+from django.db import connections, router
+
+from techtest.article.models import Article
+from techtest.utils.cache import get_versions
+from techtest.utils.pagination import (
+    CursorPaginator,
+    Page,
+    PaginationError,
+    decode_position,
+    encode_position,
+)
+
+# The title matches weigh ten content matches in the ranking
+COLUMN_WEIGHTS = {"title": 10.0, "content": 1.0}
+FTS_TABLE = "article_search"
+
+token_re = re.compile(r"[^\W_]+")
+
+
+class SearchError(ValueError):
+    """The search query of the request is not valid"""
+
+
+def tokenize(text):
+    """The words of the text, lowercased and without diacritics, like the FTS5 unicode61 tokenizer"""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return token_re.findall(text.lower())
+
+
+class FTS5SearchIndex:
+    """Search through the SQLite FTS5 table of the articles
+
+    The ``article_search`` table is an external-content FTS5 index of the
+    title and content columns, kept in sync by triggers on the article table
+    (see the migration creating it), so the bulk writes are indexed as well.
+    Its ``rank`` is configured as the BM25 score with ``COLUMN_WEIGHTS``.
+    """
+
+    def __init__(self, using):
+        self.using = using
+
+    def search(self, terms, limit, after=None):
+        """The ``(pk, rank)`` of the best ranked articles matching all the terms, after the position"""
+        # Quoted terms cannot be read as FTS5 query syntax
+        match = " ".join(f'"{term}"' for term in terms)
+        sql = f"SELECT rowid, rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+        params = [match]
+        if after is not None:
+            sql += " AND (rank > %s OR (rank = %s AND rowid > %s))"
+            params += [after[0], after[0], after[1]]
+        sql += " ORDER BY rank, rowid LIMIT %s"
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(sql, [*params, limit])
+            return cursor.fetchall()
+
+
+class PythonSearchIndex:
+    """In-process inverted index of the articles, for the databases without FTS5
+
+    The index is built on first use and rebuilt on the first search after
+    any article write, noticed from the articles version of the response
+    cache. The ranking is the same BM25 score as the FTS5 ``bm25`` function.
+
+    A fallback for development and tests only: every rebuild reads all the
+    articles, so the first search after each write costs O(N), and every
+    process holds a copy of the index. Serve the searches from a database
+    with the FTS5 table in production.
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, using):
+        self.using = using
+        self.version = None
+        self._lock = threading.Lock()
+        self.postings = {}
+        self.lengths = {}
+
+    def build(self):
+        postings, lengths = {}, {}
+        rows = Article.objects.using(self.using).values_list("pk", *COLUMN_WEIGHTS)
+        for pk, *columns in rows.iterator():
+            lengths[pk] = 0
+            for weight, text in zip(COLUMN_WEIGHTS.values(), columns):
+                tokens = tokenize(text)
+                lengths[pk] += len(tokens)
+                for token in tokens:
+                    frequencies = postings.setdefault(token, {})
+                    frequencies[pk] = frequencies.get(pk, 0) + weight
+        return postings, lengths
+
+    def load(self):
+        version = get_versions((Article,))
+        if version == self.version:
+            return self.postings, self.lengths
+        with self._lock:
+            postings, lengths = self.build()
+            self.postings, self.lengths, self.version = postings, lengths, version
+        return postings, lengths
+
+    def score(self, terms, postings, lengths):
+        """The negated BM25 scores, lower is better, of the articles matching all the terms"""
+        hits = [postings.get(term, {}) for term in terms]
+        if not all(hits):
+            return {}
+        average_length = sum(lengths.values()) / len(lengths)
+        scores = {}
+        for pk in set.intersection(*(set(frequencies) for frequencies in hits)):
+            norm = self.k1 * (1 - self.b + self.b * lengths[pk] / average_length)
+            score = 0.0
+            for frequencies in hits:
+                idf = math.log((len(lengths) - len(frequencies) + 0.5) / (len(frequencies) + 0.5))
+                frequency = frequencies[pk]
+                score += max(idf, 1e-6) * frequency * (self.k1 + 1) / (frequency + norm)
+            scores[pk] = -score
+        return scores
+
+    def search(self, terms, limit, after=None):
+        ranked = sorted(
+            (rank, pk) for pk, rank in self.score(terms, *self.load()).items()
+            if after is None or (rank, pk) > tuple(after)
+        )
+        return [(pk, rank) for rank, pk in ranked[:limit]]
+
+
+_indexes = {}
+
+
+def get_search_index(using=None):
+    """The search index of the articles database, FTS5 when the table was created"""
+    using = using or router.db_for_read(Article)
+    if using not in _indexes:
+        connection = connections[using]
+        if connection.vendor == "sqlite" and FTS_TABLE in connection.introspection.table_names():
+            _indexes[using] = FTS5SearchIndex(using)
+        else:
+            _indexes[using] = PythonSearchIndex(using)
+    return _indexes[using]
+
+
+def search_articles(request, index=None):
+    """The page of the article ids matching the ``q`` query parameter, best ranked first
+
+    The pages follow each other by keyset on the ``(rank, pk)`` position.
+    """
+    terms = list(dict.fromkeys(tokenize(request.GET.get("q", ""))))
+    if not terms:
+        raise SearchError("The q parameter must contain at least one word")
+    page_size = CursorPaginator().get_page_size(request)
+    after = None
+    cursor = request.GET.get("cursor")
+    if cursor:
+        position = decode_position(cursor)
+        try:
+            after = (float(position["rank"]), int(position["pk"]))
+        except (ValueError, TypeError, KeyError):
+            raise PaginationError("Invalid cursor")
+
+    rows = (index or get_search_index()).search(terms, page_size + 1, after)
+    page = rows[:page_size]
+    next_cursor = None
+    if len(rows) > page_size:
+        pk, rank = page[-1]
+        next_cursor = encode_position({"rank": rank, "pk": pk})
+    return Page([pk for pk, rank in page], next_cursor=next_cursor)
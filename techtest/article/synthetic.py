@@ -0,0 +1,151 @@
+import itertools
+import math
+import random
+import string
+import time
+
+from django.db import transaction
+from django.db.models import Max
+
+from techtest.article.models import Article
+from techtest.author.models import Author
+from techtest.region.cache import invalidate_region_cache
+from techtest.region.models import Region
+from techtest.utils.cache import invalidate_responses
+from techtest.utils.queryset import bulk_create_with_pks
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua enim ad minim veniam quis nostrud "
+    "exercitation ullamco laboris nisi aliquip ex ea commodo consequat duis aute irure "
+    "in reprehenderit voluptate velit esse cillum fugiat nulla pariatur excepteur sint "
+    "occaecat cupidatat non proident sunt culpa qui officia deserunt mollit anim id est "
+    "django python database index query cache region author article performance"
+).split()
+FIRST_NAMES = (
+    "Ada Alan Barbara Claude Dennis Donald Edsger Frances Grace Guido John Ken Linus "
+    "Margaret Niklaus Radia Richard Shafi Tim Whitfield"
+).split()
+LAST_NAMES = (
+    "Allen Backus Dijkstra Hamilton Hopper Kay Knuth Lamport Liskov Lovelace McCarthy "
+    "Perlman Ritchie Rossum Shannon Thompson Torvalds Turing Wirth"
+).split()
+REGION_CODES = ["".join(pair) for pair in itertools.product(string.ascii_uppercase, repeat=2)]
+CONTENT_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+
+class SyntheticData:
+    """Deterministic generator of authors, regions and articles, written with bulk inserts
+
+    The same ``seed`` generates the same rows. The articles get ``fanout``
+    distinct regions each (or all the regions when there are fewer), an
+    author picked at random, and a content of ``content_size`` characters on
+    average: exactly with the ``fixed`` distribution, between none and twice
+    as many with ``uniform``, and with a long tail of large contents with
+    ``lognormal``. The contents are slices of a corpus of words, so they are
+    searchable.
+    """
+
+    def __init__(self, seed=0, fanout=3, content_size=500, content_distribution="fixed"):
+        if content_distribution not in CONTENT_DISTRIBUTIONS:
+            raise ValueError(f"Unknown content distribution: {content_distribution}")
+        self.random = random.Random(seed)
+        self.fanout = fanout
+        self.content_size = content_size
+        self.content_distribution = content_distribution
+        corpus_size = max(content_size * 20, 100_000)
+        words = []
+        while sum(map(len, words)) + len(words) < corpus_size:
+            words.extend(self.random.choices(WORDS, k=1000))
+        self.corpus = " ".join(words)
+
+    def content_length(self):
+        if self.content_distribution == "uniform":
+            return self.random.randint(0, 2 * self.content_size)
+        if self.content_distribution == "lognormal":
+            # The median is a third of the mean, a few contents are ten times the mean
+            sigma = 1.5
+            mu = math.log(max(self.content_size, 1)) - sigma ** 2 / 2
+            return int(self.random.lognormvariate(mu, sigma))
+        return self.content_size
+
+    def content(self):
+        length = min(self.content_length(), len(self.corpus))
+        start = self.random.randrange(len(self.corpus) - length + 1)
+        return self.corpus[start:start + length]
+
+    def create_authors(self, number):
+        """Create the authors, with first and last name pairs not taken yet"""
+        offset = Author.objects.aggregate(last=Max("pk"))["last"] or 0
+        return Author.objects.bulk_create(
+            Author(
+                first_name=self.random.choice(FIRST_NAMES),
+                last_name=f"{self.random.choice(LAST_NAMES)} {offset + i}",
+            )
+            for i in range(number)
+        )
+
+    def create_regions(self, number):
+        """Create the regions, with codes not taken yet"""
+        taken = set(Region.objects.values_list("code", flat=True))
+        codes = [code for code in REGION_CODES if code not in taken]
+        if number > len(codes):
+            raise ValueError(f"Only {len(codes)} more two-letter region codes are available")
+        return Region.objects.bulk_create(
+            Region(code=code, name=f"Region {code}") for code in codes[:number]
+        )
+
+    def create_articles(self, number, chunk_size=10000, progress=None):
+        """Create the articles and their region links, a transaction per chunk
+
+        ``progress`` is called after every chunk with the number of articles
+        created so far.
+        """
+        author_ids = list(Author.objects.order_by("pk").values_list("pk", flat=True))
+        region_ids = list(Region.objects.order_by("pk").values_list("pk", flat=True))
+        fanout = min(self.fanout, len(region_ids))
+        through = Article.regions.through
+        created = 0
+        while created < number:
+            size = min(chunk_size, number - created)
+            with transaction.atomic():
+                articles = bulk_create_with_pks(Article, [
+                    Article(
+                        title=" ".join(self.random.choices(WORDS, k=5)).capitalize(),
+                        content=self.content(),
+                        author_id=self.random.choice(author_ids) if author_ids else None,
+                    )
+                    for _ in range(size)
+                ])
+                through.objects.bulk_create(
+                    through(article_id=article.pk, region_id=region_id)
+                    for article in articles
+                    for region_id in self.random.sample(region_ids, fanout)
+                )
+            created += size
+            if progress:
+                progress(created)
+        return created
+
+    def generate(self, authors, regions, articles, chunk_size=10000, progress=None):
+        """Create the authors, the regions and the articles"""
+        self.create_authors(authors)
+        self.create_regions(regions)
+        self.create_articles(articles, chunk_size, progress)
+        # The bulk inserts send no signals
+        invalidate_region_cache()
+        invalidate_responses(Author)
+        invalidate_responses(Region)
+        invalidate_responses(Article)
+        invalidate_responses(Article.regions.through)
+
+
+def rate_reporter(write, total):
+    """A ``progress`` callback writing the progress and the rows per second"""
+    started = time.monotonic()
+
+    def report(created):
+        elapsed = time.monotonic() - started
+        write(f"{created}/{total} articles ({created / max(elapsed, 1e-9):.0f} rows/s)")
+
+    return report
@@ -1,11 +1,35 @@
+import asyncio
+import base64
+import gzip
+import io
 import json
+import os
+import tempfile
+from unittest import mock
 
-from django.test import TestCase
+from asgiref.sync import sync_to_async
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import (
+    AsyncClient, RequestFactory, TestCase, TransactionTestCase, override_settings
+)
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from techtest.article.models import Article
+from techtest.article.models import Article, ArticleDocument
+from techtest.article.schemas import ArticleSchema
+from techtest.article.search import (
+    FTS5SearchIndex, PythonSearchIndex, get_search_index, search_articles
+)
+from techtest.article.views import ARTICLE_MODELS, ArticlesListView
 from techtest.author.models import Author
+from techtest.region.cache import region_cache
 from techtest.region.models import Region
+from techtest.urls import urlpatterns
+from techtest.utils.cache import get_versions, response_cache
+from techtest.utils import views
+from techtest.utils.queryset import iter_batches, plan_queryset
+from techtest.utils.serializers import get_serializer
 
 
 class ArticleListViewTestCase(TestCase):
@@ -175,6 +199,277 @@ class ArticleListViewTestCase(TestCase):
         )
 
 
+class ArticleListViewQueryCountTestCase(TestCase):
+    def setUp(self):
+        self.url = reverse("articles-list")
+        self.regions = [
+            Region.objects.create(code="AL", name="Albania"),
+            Region.objects.create(code="UK", name="United Kingdom"),
+        ]
+        # The regions are serialized from the in-process catalogue
+        region_cache.load()
+
+    def create_articles(self, number):
+        start = Article.objects.count()
+        for i in range(start, start + number):
+            author = Author.objects.create(first_name=f"FN {i}", last_name=f"LN {i}")
+            article = Article.objects.create(title=f"Fake Article {i}", author=author)
+            article.regions.set(self.regions)
+
+    def test_query_count_does_not_depend_on_list_size(self):
+        """The articles with their authors, and the regions in a single prefetch"""
+        self.create_articles(2)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.json()), 2)
+
+        self.create_articles(10)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.json()), 12)
+
+    def test_values_list_matches_the_model_instances_serialization(self):
+        self.create_articles(3)
+        Article.objects.create(title="Without author nor regions")
+        response = self.client.get(self.url)
+        self.assertEqual(
+            response.json(),
+            get_serializer(ArticleSchema).dump_many(
+                plan_queryset(Article.objects.order_by("pk"), ArticleSchema)
+            ),
+        )
+
+    def test_single_article_query_count(self):
+        self.create_articles(1)
+        url = reverse("article", kwargs={"article_id": Article.objects.get().id})
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(len(response.json()["regions"]), 2)
+
+
+class ArticleListPaginationTestCase(TestCase):
+    def setUp(self):
+        self.url = reverse("articles-list")
+        self.articles = [
+            Article.objects.create(title=f"Fake Article {i}") for i in range(7)
+        ]
+
+    def get_page(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        links = {}
+        for link in filter(None, response.get("Link", "").split(", ")):
+            url, rel = link.split("; ")
+            links[rel[len('rel="'):-1]] = url[1:-1]
+        return [article["id"] for article in response.json()], links
+
+    def test_walks_forward_and_backward_with_cursors(self):
+        ids = [article.id for article in self.articles]
+        page, links = self.get_page(self.url, page_size=3)
+        self.assertEqual(page, ids[:3])
+        self.assertNotIn("prev", links)
+
+        page, links = self.get_page(links["next"])
+        self.assertEqual(page, ids[3:6])
+        page, links = self.get_page(links["next"])
+        self.assertEqual(page, ids[6:])
+        self.assertNotIn("next", links)
+
+        page, links = self.get_page(links["prev"])
+        self.assertEqual(page, ids[3:6])
+        page, links = self.get_page(links["prev"])
+        self.assertEqual(page, ids[:3])
+        self.assertNotIn("prev", links)
+
+    def test_page_size_is_capped(self):
+        with self.settings(PAGINATION_MAX_PAGE_SIZE=5):
+            page, links = self.get_page(self.url, page_size=100)
+        self.assertEqual(len(page), 5)
+        self.assertIn("next", links)
+
+    def test_page_query_count_does_not_depend_on_page_number(self):
+        page, links = self.get_page(self.url, page_size=2)
+        with self.assertNumQueries(2):
+            self.client.get(links["next"])
+
+    def test_rejects_invalid_parameters(self):
+        for params in ({"cursor": "not-a-cursor"}, {"page_size": "x"}, {"page_size": 0}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400)
+
+    def test_rejects_forged_cursors_out_of_the_key_range(self):
+        for payload in (b'{"pk": 1e400, "r": false}', b'{"pk": 99999999999999999999, "r": false}'):
+            with self.subTest(payload=payload):
+                cursor = base64.urlsafe_b64encode(payload).decode()
+                response = self.client.get(self.url, {"cursor": cursor})
+                self.assertEqual(response.status_code, 400)
+
+
+class ArticleListStreamTestCase(TestCase):
+    def setUp(self):
+        self.url = reverse("articles-list")
+        region = Region.objects.create(code="AL", name="Albania")
+        for i in range(5):
+            article = Article.objects.create(title=f"Fake Article {i}")
+            article.regions.set([region])
+        region_cache.load()
+
+    def test_streams_all_articles_in_chunks(self):
+        with self.settings(STREAM_CHUNK_SIZE=2, PAGINATION_MAX_PAGE_SIZE=1):
+            response = self.client.get(self.url, {"stream": "true"})
+            self.assertTrue(response.streaming)
+            # A single cursor over the articles, and the region links of each of
+            # the three chunks
+            with self.assertNumQueries(4):
+                articles = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(
+            [article["id"] for article in articles],
+            list(Article.objects.order_by("pk").values_list("pk", flat=True)),
+        )
+        self.assertEqual(articles[0]["regions"][0]["code"], "AL")
+
+    def test_streams_an_empty_list(self):
+        Article.objects.all().delete()
+        response = self.client.get(self.url, {"stream": "true"})
+        self.assertEqual(json.loads(b"".join(response.streaming_content)), [])
+
+
+class ArticleListFilterTestCase(TestCase):
+    def setUp(self):
+        self.url = reverse("articles-list")
+        self.uk = Region.objects.create(code="UK", name="United Kingdom")
+        self.al = Region.objects.create(code="AL", name="Albania")
+        self.smith = Author.objects.create(first_name="Jane", last_name="Smith")
+        self.doe = Author.objects.create(first_name="John", last_name="Doe")
+        self.articles = [
+            Article.objects.create(title="Django tips", author=self.smith),
+            Article.objects.create(title="Django tricks", author=self.doe),
+            Article.objects.create(title="Djangology", author=self.smith),
+            Article.objects.create(title="Flask tips"),
+        ]
+        self.articles[0].regions.set([self.uk, self.al])
+        self.articles[1].regions.set([self.uk])
+        self.articles[2].regions.set([self.al])
+        region_cache.load()
+
+    def filter(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [article["id"] for article in json.loads(response.content)]
+
+    def ids(self, *positions):
+        return [self.articles[position].id for position in positions]
+
+    def test_filters_articles(self):
+        self.assertEqual(self.filter(region="UK"), self.ids(0, 1))
+        self.assertEqual(self.filter(region=["UK", "AL"]), self.ids(0, 1, 2))
+        self.assertEqual(self.filter(author=self.smith.id), self.ids(0, 2))
+        self.assertEqual(self.filter(author_last_name="Doe"), self.ids(1))
+        self.assertEqual(self.filter(title_prefix="Django"), self.ids(0, 1, 2))
+        self.assertEqual(self.filter(title_prefix="Django "), self.ids(0, 1))
+        self.assertEqual(self.filter(title_prefix="django"), [])
+        self.assertEqual(
+            self.filter(id_min=self.articles[1].id, id_max=self.articles[2].id), self.ids(1, 2)
+        )
+        self.assertEqual(self.filter(region="UK", author_last_name="Smith"), self.ids(0))
+
+    def test_filters_paginated_and_streamed_lists(self):
+        response = self.client.get(self.url, {"region": ["UK", "AL"], "page_size": 2})
+        self.assertIn("region=UK&region=AL", response["Link"])
+        response = self.client.get(response["Link"].split(">")[0].lstrip("<"))
+        self.assertEqual([article["id"] for article in json.loads(response.content)], self.ids(2))
+
+        response = self.client.get(self.url, {"author": self.smith.id, "stream": "true"})
+        articles = json.loads(b"".join(response.streaming_content))
+        self.assertEqual([article["id"] for article in articles], self.ids(0, 2))
+
+    def test_rejects_invalid_values(self):
+        for params in (
+            {"author": "smith"},
+            {"id_min": "first"},
+            {"title_prefix": ["a", "b"]},
+            {"author": "99999999999999999999"},
+            {"id_min": "99999999999999999999"},
+            {"id_max": str(-(2 ** 63) - 1)},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", json.loads(response.content))
+
+    def test_filters_are_served_by_indexes(self):
+        for params in (
+            {"region": "UK"},
+            {"region": ["UK", "AL"]},
+            {"author": "1"},
+            {"author_last_name": "Smith"},
+            {"title_prefix": "Django"},
+            {"id_min": "1", "id_max": "10"},
+            {"region": "UK", "author_last_name": "Smith", "title_prefix": "Django"},
+        ):
+            with self.subTest(params=params):
+                view = ArticlesListView()
+                view.setup(RequestFactory().get(self.url, params))
+                plan = view.get_list_queryset().order_by("pk")[:101].explain()
+                # Every table is searched through an index, none is scanned
+                self.assertNotIn("SCAN", plan)
+                self.assertIn("SEARCH", plan)
+
+
+class ArticleFieldsetTestCase(TestCase):
+    def setUp(self):
+        self.author = Author.objects.create(first_name="First name", last_name="Last Name")
+        self.article = Article.objects.create(
+            title="Fake Article 1", content="Lorem Ipsum" * 100, author=self.author
+        )
+        self.article.regions.set([Region.objects.create(code="AL", name="Albania")])
+        self.list_url = reverse("articles-list")
+        self.url = reverse("article", kwargs={"article_id": self.article.id})
+        region_cache.load()
+
+    def get(self, url, queries, **params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(context.captured_queries), queries)
+        return json.loads(response.content), " ".join(query["sql"] for query in context.captured_queries)
+
+    def test_lists_sparse_fieldsets(self):
+        articles, sql = self.get(self.list_url, 1, fields="id,title")
+        self.assertEqual(articles, [{"id": self.article.id, "title": "Fake Article 1"}])
+        self.assertNotIn('"content"', sql)
+        self.assertNotIn("author", sql)
+
+        articles, sql = self.get(self.list_url, 2, fields="title", expand="regions")
+        self.assertEqual(articles, [{"title": "Fake Article 1", "regions": [
+            {"id": self.article.regions.get().id, "code": "AL", "name": "Albania"},
+        ]}])
+
+    def test_expands_relations_on_request(self):
+        articles, sql = self.get(self.list_url, 1, expand="author")
+        self.assertEqual(set(articles[0]), {"id", "title", "content", "author"})
+        self.assertEqual(articles[0]["author"]["last_name"], "Last Name")
+
+        articles, sql = self.get(self.list_url, 2)
+        self.assertEqual(set(articles[0]), {"id", "title", "content", "author", "regions"})
+
+    def test_serializes_sparse_single_article(self):
+        article, sql = self.get(self.url, 1, fields="title")
+        self.assertEqual(article, {"title": "Fake Article 1"})
+        self.assertNotIn('"content"', sql)
+
+        article, sql = self.get(self.url, 2, fields="id,regions")
+        self.assertEqual(set(article), {"id", "regions"})
+
+    def test_rejects_unknown_fields(self):
+        for url in (self.list_url, self.url):
+            for params in ({"fields": "id,missing"}, {"expand": "title"}, {"fields": ","}):
+                with self.subTest(url=url, params=params):
+                    response = self.client.get(url, params)
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn("error", json.loads(response.content))
+
+
 class ArticleViewTestCase(TestCase):
     def setUp(self):
         self.author = Author.objects.create(
@@ -186,6 +481,7 @@ class ArticleViewTestCase(TestCase):
         self.region_2 = Region.objects.create(code="UK", name="United Kingdom")
         self.article.regions.set([self.region_1, self.region_2])
         self.url = reverse("article", kwargs={"article_id": self.article.id})
+        region_cache.load()
 
     def test_serializes_single_record_with_correct_data_shape_and_status_code(self):
         response = self.client.get(self.url)
@@ -285,7 +581,753 @@ class ArticleViewTestCase(TestCase):
             jresp,
         )
 
+    def test_region_resolution_query_count_does_not_depend_on_region_count(self):
+        def put(regions):
+            payload = {"title": "Fake Article 1", "regions": regions}
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.put(
+                    self.url, data=json.dumps(payload), content_type="application/json"
+                )
+            self.assertEqual(response.status_code, 200)
+            return [query["sql"] for query in queries]
+
+        regions = [{"code": f"{i:02d}", "name": f"Region {i}"} for i in range(50)]
+        queries = put(regions[:2])
+        self.assertEqual(len(put(regions[2:])), len(queries))
+        self.assertEqual(self.article.regions.count(), 48)
+
+        # Unchanged links cost no write
+        queries = put(regions[2:])
+        self.assertFalse([sql for sql in queries if "article_article_regions" in sql and "SELECT" not in sql])
+
+    def put_queries(self, payload):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.put(
+                self.url, data=json.dumps(payload), content_type="application/json"
+            )
+        self.assertEqual(response.status_code, 200)
+        return response, [query["sql"] for query in queries]
+
+    def test_unchanged_update_writes_nothing(self):
+        payload = {
+            "title": "Fake Article 1",
+            "content": "",
+            "author": {"id": self.author.id, "first_name": "First name"},
+            "regions": [{"code": "UK"}, {"id": self.region_1.id}],
+        }
+        response, queries = self.put_queries(payload)
+        # The article with its author, its regions, and the regions referenced
+        self.assertEqual(len(queries), 3, queries)
+        self.assertEqual(response.json(), self.client.get(self.url).json())
+
+    def test_updates_only_the_changed_fields(self):
+        payload = {"title": "Fake Article 1 (Modified)", "content": "", "author": None}
+        response, queries = self.put_queries(payload)
+        updates = [sql for sql in queries if sql.startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"title"', updates[0])
+        self.assertIn('"author_id"', updates[0])
+        self.assertNotIn('"content"', updates[0])
+        self.assertEqual(response.json(), self.client.get(self.url).json())
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.title, "Fake Article 1 (Modified)")
+        self.assertIsNone(self.article.author)
+
+    def test_partially_updates_article(self):
+        expected = self.client.get(self.url).json()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(
+                self.url, data=json.dumps({"title": "Patched"}), content_type="application/json"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), dict(expected, title="Patched"))
+        writes = [query["sql"] for query in queries if not query["sql"].startswith("SELECT")]
+        self.assertEqual(len(writes), 1)
+        self.assertRegex(writes[0], r'^UPDATE "article_article" SET "title" = \S+ WHERE')
+
+        response = self.client.patch(
+            self.url, data=json.dumps({"regions": [{"id": self.region_2.id}]}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.json()["regions"], [expected["regions"][1]])
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.title, "Patched")
+        self.assertEqual(self.article.author, self.author)
+        self.assertEqual(list(self.article.regions.all()), [self.region_2])
+
+    def test_rejects_invalid_partial_update(self):
+        response = self.client.patch(
+            self.url, data=json.dumps({"title": "x" * 256}), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("title", response.json())
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.title, "Fake Article 1")
+
+    def test_rejects_unknown_region(self):
+        payload = {"title": "Fake Article 1", "regions": [{"id": 999}]}
+        response = self.client.put(
+            self.url, data=json.dumps(payload), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"regions": {"0": ["The region does not exist"]}})
+
     def test_removes_article(self):
         response = self.client.delete(self.url)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(Article.objects.count(), 0)
+
+
+class ArticlesBulkViewTestCase(TestCase):
+    def setUp(self):
+        self.url = reverse("articles-bulk")
+        self.author = Author.objects.create(first_name="First name", last_name="Last Name")
+        self.region_1 = Region.objects.create(code="AL", name="Albania")
+        self.region_2 = Region.objects.create(code="UK", name="United Kingdom")
+        self.article = Article.objects.create(title="Fake Article 1", author=self.author)
+        self.article.regions.set([self.region_1, self.region_2])
+        region_cache.load()
+
+    def post(self, payload):
+        return self.client.post(
+            self.url, data=json.dumps(payload), content_type="application/json"
+        )
+
+    def test_creates_and_updates_articles(self):
+        response = self.post([
+            {
+                "id": self.article.id,
+                "title": "Fake Article 1 (Modified)",
+                "author": None,
+                "regions": [{"id": self.region_2.id}, {"code": "US", "name": "United States"}],
+            },
+            {
+                "title": "Fake Article 2",
+                "content": "Lorem Ipsum",
+                "author": {"first_name": "New FN", "last_name": "New LN"},
+                "regions": [{"code": "AL"}],
+            },
+            {"title": "Fake Article 3", "author": {"id": self.author.id}},
+        ])
+        self.assertEqual(response.status_code, 200)
+        results = response.json()
+        self.assertEqual([result["status"] for result in results], [200, 201, 201])
+        us = Region.objects.get(code="US")
+        new_author = Author.objects.get(first_name="New FN")
+        self.assertDictEqual(results[0]["data"], {
+            "id": self.article.id,
+            "title": "Fake Article 1 (Modified)",
+            "content": "",
+            "author": None,
+            "regions": [
+                {"id": self.region_2.id, "code": "UK", "name": "United Kingdom"},
+                {"id": us.id, "code": "US", "name": "United States"},
+            ],
+        })
+        article_2 = Article.objects.get(title="Fake Article 2")
+        self.assertEqual(results[1]["data"]["id"], article_2.id)
+        self.assertEqual(article_2.author, new_author)
+        self.assertEqual(list(article_2.regions.all()), [self.region_1])
+        article_3 = Article.objects.get(title="Fake Article 3")
+        self.assertEqual(results[2]["data"]["id"], article_3.id)
+        self.assertEqual(article_3.author, self.author)
+        self.assertEqual(Article.objects.count(), 3)
+
+    def test_reports_per_item_errors(self):
+        response = self.post([
+            {"title": "x" * 256},
+            {"title": "Unknown region", "regions": [{"id": 999}]},
+            {"title": "Unknown author", "author": {"id": 999}},
+            {"title": "Valid"},
+            {"id": self.article.id},
+            {"id": self.article.id},
+        ])
+        results = response.json()
+        self.assertEqual(
+            [result["status"] for result in results], [400, 400, 400, 201, 200, 400]
+        )
+        self.assertIn("title", results[0]["errors"])
+        self.assertEqual(results[1]["errors"], {"regions": {"0": ["The region does not exist"]}})
+        self.assertEqual(results[2]["errors"], {"author": ["The author does not exist"]})
+        self.assertEqual(Article.objects.count(), 2)
+
+    def test_query_count_does_not_depend_on_batch_size(self):
+        def payload(number, offset):
+            return [
+                {
+                    "title": f"Fake Article {i}",
+                    "author": {"first_name": f"FN {i}", "last_name": f"LN {i}"},
+                    "regions": [{"code": "AL"}, {"code": f"{i:02d}"}],
+                }
+                for i in range(offset, offset + number)
+            ]
+
+        with self.assertNumQueries(14):
+            self.post(payload(2, 0))
+        with self.assertNumQueries(14):
+            self.post(payload(20, 2))
+        self.assertEqual(Article.objects.count(), 23)
+
+    def test_rejects_oversized_and_malformed_batches(self):
+        with self.settings(BULK_MAX_ITEMS=1):
+            self.assertEqual(self.post([{}, {}]).status_code, 400)
+        self.assertEqual(self.post({"title": "Not a list"}).status_code, 400)
+        response = self.client.post(self.url, data="[{", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_does_not_create_the_references_of_rejected_items(self):
+        results = self.post([
+            {
+                "title": "Unknown author",
+                "author": {"id": 999},
+                "regions": [{"code": "US", "name": "United States"}],
+            },
+            {
+                "title": "Unknown region",
+                "author": {"first_name": "New FN", "last_name": "New LN"},
+                "regions": [{"id": 999}],
+            },
+            {"title": "Valid", "regions": [{"code": "FR", "name": "France"}]},
+        ]).json()
+        self.assertEqual([result["status"] for result in results], [400, 400, 201])
+        self.assertFalse(Region.objects.filter(code="US").exists())
+        self.assertFalse(Author.objects.filter(first_name="New FN").exists())
+        self.assertEqual(results[2]["data"]["regions"][0]["code"], "FR")
+
+
+class ResponseCacheTestCase(TestCase):
+    def setUp(self):
+        self.url = reverse("articles-list")
+        self.author = Author.objects.create(first_name="First name", last_name="Last Name")
+        self.region = Region.objects.create(code="AL", name="Albania")
+        self.article = Article.objects.create(title="Fake Article 1", author=self.author)
+        region_cache.load()
+
+    def assertCached(self, url):
+        hits = response_cache.hits
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response_cache.hits, hits + 1)
+        return response.json()
+
+    def assertNotCached(self, url):
+        misses = response_cache.misses
+        response = self.client.get(url)
+        self.assertEqual(response_cache.misses, misses + 1)
+        return response.json()
+
+    def test_serves_repeated_reads_from_the_cache(self):
+        detail_url = reverse("article", kwargs={"article_id": self.article.id})
+        self.assertEqual(self.assertNotCached(self.url), self.assertCached(self.url))
+        self.assertEqual(self.assertNotCached(detail_url), self.assertCached(detail_url))
+        # The query string is part of the key
+        self.assertNotCached(self.url + "?page_size=1")
+
+    def test_is_invalidated_by_related_model_writes(self):
+        self.assertNotCached(self.url)
+
+        self.author.first_name = "Renamed"
+        self.author.save()
+        self.assertEqual(self.assertNotCached(self.url)[0]["author"]["first_name"], "Renamed")
+
+        self.article.regions.add(self.region)
+        self.assertEqual(self.assertNotCached(self.url)[0]["regions"][0]["name"], "Albania")
+
+        self.region.name = "Republic of Albania"
+        self.region.save()
+        self.assertEqual(
+            self.assertNotCached(self.url)[0]["regions"][0]["name"], "Republic of Albania"
+        )
+
+        self.client.post(
+            reverse("articles-bulk"),
+            data=json.dumps([{"id": self.article.id, "title": "Bulk title"}]),
+            content_type="application/json",
+        )
+        self.assertEqual(self.assertNotCached(self.url)[0]["title"], "Bulk title")
+
+    def test_is_not_invalidated_by_unrelated_model_writes(self):
+        url = reverse("author-list")
+        self.assertNotCached(url)
+        Article.objects.create(title="Fake Article 2")
+        self.assertCached(url)
+
+    def test_does_not_track_the_other_models(self):
+        versions = get_versions(ARTICLE_MODELS)
+        ArticleDocument.objects.create(article=self.article, document="{}")
+        self.assertEqual(get_versions(ARTICLE_MODELS), versions)
+
+    @override_settings(ALLOWED_HOSTS=["a.example", "b.example"])
+    def test_keys_the_responses_by_host_and_scheme(self):
+        Article.objects.create(title="Fake Article 2")
+        url = self.url + "?page_size=1"
+        link = self.client.get(url, HTTP_HOST="a.example")["Link"]
+        self.assertIn("http://a.example/", link)
+        for host, secure in (("b.example", False), ("a.example", True)):
+            with self.subTest(host=host, secure=secure):
+                response = self.client.get(url, HTTP_HOST=host, secure=secure)
+                scheme = "https" if secure else "http"
+                self.assertIn(f"{scheme}://{host}/", response["Link"])
+
+
+class ConditionalGetTestCase(TestCase):
+    def setUp(self):
+        self.article = Article.objects.create(title="Fake Article 1")
+        self.urls = [
+            reverse("articles-list"),
+            reverse("article", kwargs={"article_id": self.article.id}),
+        ]
+
+    def test_answers_not_modified_to_matching_etag(self):
+        for url in self.urls:
+            etag = self.client.get(url)["ETag"]
+            with self.assertNumQueries(0):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response["ETag"], etag)
+            self.assertEqual(response.content, b"")
+
+    def test_changes_etag_when_the_data_changes(self):
+        for url in self.urls:
+            etag = self.client.get(url)["ETag"]
+            self.article.title = f"Fake Article for {url}"
+            self.article.save()
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response["ETag"], etag)
+
+    def test_works_without_the_response_cache(self):
+        with self.settings(RESPONSE_CACHE_ENABLED=False):
+            etag = self.client.get(self.urls[0])["ETag"]
+            response = self.client.get(self.urls[0], HTTP_IF_NONE_MATCH=f'"other", {etag}')
+        self.assertEqual(response.status_code, 304)
+
+    def test_matches_any_etag_only_for_existing_representations(self):
+        for url in self.urls:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH="*")
+            self.assertEqual(response.status_code, 304)
+        missing = reverse("article", kwargs={"article_id": self.article.id + 1})
+        self.assertEqual(self.client.get(missing, HTTP_IF_NONE_MATCH="*").status_code, 404)
+
+
+class ArticlesSearchViewTestCase(TestCase):
+    def setUp(self):
+        self.url = reverse("articles-search")
+        region = Region.objects.create(code="AL", name="Albania")
+        self.in_title = Article.objects.create(title="Django performance", content="Lorem ipsum")
+        self.in_content = Article.objects.create(
+            title="Lorem ipsum", content="Notes on Django and its performance"
+        )
+        self.in_both = Article.objects.create(
+            title="Performance", content="Django, Django and more Django performance"
+        )
+        Article.objects.create(title="Unrelated", content="Nothing to see")
+        self.in_title.regions.set([region])
+        region_cache.load()
+
+    def search(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, [article["id"] for article in json.loads(response.content)]
+
+    def test_ranks_matching_articles(self):
+        response, ids = self.search(q="django PERFORMANCE")
+        # A title match weighs ten content matches
+        self.assertEqual(ids, [self.in_title.id, self.in_both.id, self.in_content.id])
+        self.assertEqual(json.loads(response.content)[0]["regions"][0]["code"], "AL")
+        self.assertEqual(self.search(q="nowhere")[1], [])
+
+    def test_uses_the_fts5_index_kept_in_sync_by_triggers(self):
+        self.assertIsInstance(get_search_index(), FTS5SearchIndex)
+        self.in_content.delete()
+        Article.objects.filter(pk=self.in_title.pk).update(title="Renamed")
+        Article.objects.bulk_create([Article(title="Bulk", content="django performance")])
+        ids = self.search(q="django performance")[1]
+        self.assertEqual(ids[0], self.in_both.id)
+        self.assertEqual(Article.objects.get(pk=ids[1]).title, "Bulk")
+        self.assertEqual(len(ids), 2)
+        self.assertEqual(self.search(q="renamed")[1], [self.in_title.id])
+
+    def test_skips_the_articles_deleted_since_the_index_lookup(self):
+        def search_then_delete(request):
+            page = search_articles(request)
+            Article.objects.filter(pk=self.in_both.pk).delete()
+            return page
+
+        with mock.patch("techtest.article.views.search_articles", search_then_delete):
+            ids = self.search(q="django performance")[1]
+        self.assertEqual(ids, [self.in_title.id, self.in_content.id])
+
+    def test_paginates_by_rank(self):
+        response, first = self.search(q="django", page_size=2)
+        self.assertEqual(first, [self.in_title.id, self.in_both.id])
+        next_url = response["Link"].split(">")[0].lstrip("<")
+        response = self.client.get(next_url)
+        self.assertEqual([article["id"] for article in json.loads(response.content)], [self.in_content.id])
+        self.assertFalse(response.has_header("Link"))
+
+    def test_query_count_does_not_depend_on_result_count(self):
+        # The search, the articles with their authors, and the region links
+        with self.assertNumQueries(3):
+            self.client.get(self.url, {"q": "django"})
+
+    def test_python_index_ranks_like_fts5(self):
+        index = PythonSearchIndex("default")
+        for terms in (["django"], ["django", "performance"], ["lorem"], ["missing"]):
+            with self.subTest(terms=terms):
+                expected = get_search_index().search(terms, 10)
+                ranked = index.search(terms, 10)
+                self.assertEqual([pk for pk, rank in ranked], [pk for pk, rank in expected])
+                for (_, rank), (_, expected_rank) in zip(ranked, expected):
+                    self.assertAlmostEqual(rank, expected_rank)
+        after = index.search(["django"], 1)[0]
+        self.assertEqual(index.search(["django"], 10, after[::-1]), index.search(["django"], 10)[1:])
+
+    def test_rejects_invalid_parameters(self):
+        for params in ({}, {"q": "?!"}, {"q": "django", "cursor": "invalid"}):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", json.loads(response.content))
+
+
+async def asgi_get(path, query_string="", events=None):
+    """The status and the body messages of a GET request served by the ASGI application
+
+    The body messages are also recorded as "body" in the ``events`` list.
+    """
+    from techtest.asgi import AsyncViewsASGIHandler
+
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+        if events is not None and message["type"] == "http.response.body":
+            events.append("body")
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": query_string.encode(),
+        "headers": [],
+        "server": ("testserver", 80),
+    }
+    await AsyncViewsASGIHandler()(scope, receive, send)
+    return messages[0]["status"], [message.get("body", b"") for message in messages[1:]]
+
+
+@override_settings(ROOT_URLCONF="techtest.asgi_urls", ASYNC_VIEWS_THREAD_SENSITIVE=True)
+class AsyncArticleViewsTestCase(TestCase):
+    # The thread-sensitive hops use the connection of the test transaction
+    async_client_class = AsyncClient
+
+    def setUp(self):
+        self.region = Region.objects.create(code="AL", name="Albania")
+        self.article = Article.objects.create(title="Fake Article 1")
+        self.article.regions.set([self.region])
+        region_cache.load()
+
+    def test_routes_the_same_urls_to_async_views(self):
+        from techtest.asgi_urls import urlpatterns as async_urlpatterns
+
+        self.assertEqual(
+            [pattern.name for pattern in async_urlpatterns[1:]],
+            [pattern.name for pattern in urlpatterns[1:]],
+        )
+        for pattern in async_urlpatterns[1:]:
+            self.assertTrue(asyncio.iscoroutinefunction(pattern.callback))
+
+    async def test_lists_and_streams_articles(self):
+        response = await self.async_client.get(reverse("articles-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)[0]["regions"][0]["code"], "AL")
+
+    async def test_streams_the_chunks_out_of_the_event_loop(self):
+        await sync_to_async(Article.objects.create)(title="Fake Article 2")
+        events = []
+
+        def batches(queryset, chunk_size):
+            for batch in iter_batches(queryset, chunk_size):
+                events.append("batch")
+                yield batch
+
+        with self.settings(STREAM_CHUNK_SIZE=1), mock.patch.object(views, "iter_batches", batches):
+            status, bodies = await asgi_get(reverse("articles-list"), "stream=true", events)
+        self.assertEqual(status, 200)
+        # Sent as they are produced, an article per chunk after the opening
+        # bracket, rather than all read first
+        self.assertEqual(events[:4], ["body", "batch", "body", "batch"])
+        self.assertEqual(
+            [article["title"] for article in json.loads(b"".join(bodies))],
+            ["Fake Article 1", "Fake Article 2"],
+        )
+
+    async def test_creates_updates_and_removes_an_article(self):
+        response = await self.async_client.post(
+            reverse("articles-list"),
+            data={"title": "Fake Article 2", "content": "Lorem Ipsum", "regions": [{"code": "AL"}]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+        url = reverse("article", kwargs={"article_id": json.loads(response.content)["id"]})
+
+        response = await self.async_client.put(
+            url,
+            data={"title": "Fake Article 3", "content": "Lorem Ipsum", "regions": []},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)["title"], "Fake Article 3")
+
+        response = await self.async_client.get(url)
+        self.assertEqual(json.loads(response.content)["regions"], [])
+
+        response = await self.async_client.delete(url)
+        self.assertEqual(response.status_code, 200)
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(ROOT_URLCONF="techtest.asgi_urls", ASYNC_VIEWS_THREAD_SENSITIVE=False)
+class AsyncArticleViewsThreadPoolTestCase(TransactionTestCase):
+    # The pool threads have connections of their own, which only see the
+    # committed rows
+    async_client_class = AsyncClient
+
+    def setUp(self):
+        self.region = Region.objects.create(code="AL", name="Albania")
+        Article.objects.create(title="Fake Article 1").regions.set([self.region])
+        Article.objects.create(title="Fake Article 2")
+
+    async def test_serves_the_views_from_the_pool(self):
+        response = await self.async_client.post(
+            reverse("articles-list"),
+            data={"title": "Fake Article 3", "regions": [{"code": "AL"}]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+        response = await self.async_client.get(reverse("articles-list"))
+        self.assertEqual(
+            [article["title"] for article in json.loads(response.content)],
+            ["Fake Article 1", "Fake Article 2", "Fake Article 3"],
+        )
+
+    async def test_streams_the_chunks_from_a_thread_of_their_own(self):
+        with self.settings(STREAM_CHUNK_SIZE=1):
+            status, bodies = await asgi_get(reverse("articles-list"), "stream=true")
+        self.assertEqual(status, 200)
+        self.assertGreater(len([body for body in bodies if body]), 2)
+        self.assertEqual(
+            [article["regions"] for article in json.loads(b"".join(bodies))],
+            [[{"id": self.region.id, "code": "AL", "name": "Albania"}], []],
+        )
+
+
+@override_settings(ARTICLE_DOCUMENTS_ENABLED=True)
+class ArticleDocumentTestCase(TestCase):
+    def setUp(self):
+        self.author = Author.objects.create(first_name="First name", last_name="Last Name")
+        self.uk = Region.objects.create(code="UK", name="United Kingdom")
+        self.al = Region.objects.create(code="AL", name="Albania")
+        self.article = Article.objects.create(title="Fake Article 1", author=self.author)
+        self.article.regions.set([self.uk, self.al])
+        self.other = Article.objects.create(title="Fake Article 2", author=self.author)
+        self.other.regions.set([self.uk])
+        region_cache.load()
+
+    def document(self, article):
+        return json.loads(ArticleDocument.objects.get(pk=article.pk).document)
+
+    def assertDocumentsAreFresh(self):
+        serializer = get_serializer(ArticleSchema)
+        for article in plan_queryset(Article.objects.all(), ArticleSchema):
+            self.assertEqual(self.document(article), serializer.dump(article))
+
+    def test_serves_the_documents(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("articles-list"), {"region": "AL"})
+        self.assertEqual(json.loads(response.content), [self.document(self.article)])
+        with self.settings(ARTICLE_DOCUMENTS_ENABLED=False):
+            expected = json.loads(self.client.get(reverse("articles-list")).content)
+        self.assertEqual(json.loads(self.client.get(reverse("articles-list")).content), expected)
+
+        url = reverse("article", kwargs={"article_id": self.article.id})
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(json.loads(response.content), expected[0])
+
+    def test_is_maintained_on_writes(self):
+        self.author.last_name = "Renamed"
+        self.author.save()
+        self.assertEqual(self.document(self.other)["author"]["last_name"], "Renamed")
+        self.uk.name = "Great Britain"
+        self.uk.save()
+        self.assertEqual(self.document(self.other)["regions"][0]["name"], "Great Britain")
+        self.al.delete()
+        self.article.regions.remove(self.uk)
+        self.assertEqual(self.document(self.article)["regions"], [])
+        self.uk.articles.clear()
+        self.assertEqual(self.document(self.other)["regions"], [])
+        self.assertDocumentsAreFresh()
+
+        self.client.put(
+            reverse("article", kwargs={"article_id": self.article.id}),
+            data={"title": "Updated", "regions": [{"code": "US", "name": "United States"}]},
+            content_type="application/json",
+        )
+        self.client.post(
+            reverse("articles-bulk"),
+            data=[{"id": self.other.id, "title": "Bulk"}, {"title": "New", "regions": [{"code": "UK"}]}],
+            content_type="application/json",
+        )
+        self.assertEqual(ArticleDocument.objects.count(), 3)
+        self.assertDocumentsAreFresh()
+
+        self.article.delete()
+        self.assertFalse(ArticleDocument.objects.filter(pk=self.article.pk).exists())
+
+    def test_writes_render_each_document_once(self):
+        url = reverse("article", kwargs={"article_id": self.article.id})
+        with CaptureQueriesContext(connection) as context:
+            self.client.put(
+                url, data={"title": "Updated", "regions": [{"code": "UK"}]},
+                content_type="application/json",
+            )
+        renders = [query for query in context.captured_queries if "article_articledocument" in query["sql"]]
+        # The existing document lookup, and its update
+        self.assertEqual(len(renders), 2)
+
+    def test_rebuilds_the_documents(self):
+        Article.objects.filter(pk=self.article.pk).update(title="Updated")
+        ArticleDocument.objects.filter(pk=self.other.pk).delete()
+        self.assertEqual(self.document(self.article)["title"], "Fake Article 1")
+        # The missing documents are rendered on the fly
+        response = self.client.get(reverse("articles-list"))
+        self.assertEqual(json.loads(response.content)[1]["title"], "Fake Article 2")
+        self.assertTrue(ArticleDocument.objects.filter(pk=self.other.pk).exists())
+
+        call_command("rebuild_article_documents", batch_size=1, stdout=io.StringIO())
+        self.assertDocumentsAreFresh()
+
+    def test_renders_the_regions_from_the_database(self):
+        # Renamed by another process, unnoticed by the catalogue of this one
+        Region.objects.filter(pk=self.uk.pk).update(name="Great Britain")
+        self.article.title = "Updated"
+        self.article.save()
+        self.assertEqual(
+            [region["name"] for region in self.document(self.article)["regions"]],
+            ["Great Britain", "Albania"],
+        )
+
+    def test_rejects_invalid_fieldsets(self):
+        for url in (reverse("articles-list"), reverse("article", kwargs={"article_id": self.article.id})):
+            for params in ({"fields": "bogus"}, {"expand": "bogus"}):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", json.loads(response.content))
+
+    def test_falls_back_to_the_live_serialization(self):
+        response = self.client.get(reverse("articles-list"), {"fields": "id,title"})
+        self.assertEqual(set(json.loads(response.content)[0]), {"id", "title"})
+        response = self.client.get(reverse("articles-list"), {"stream": "true"})
+        self.assertEqual(len(json.loads(b"".join(response.streaming_content))), 2)
+
+
+class ImportExportCommandsTestCase(TestCase):
+    def setUp(self):
+        author = Author.objects.create(first_name="First name", last_name="Last Name")
+        regions = [
+            Region.objects.create(code="AL", name="Albania"),
+            Region.objects.create(code="UK", name="United Kingdom"),
+        ]
+        for i in range(5):
+            Article.objects.create(
+                title=f"Fake Article {i}", content="Lorem Ipsum", author=author if i % 2 else None
+            ).regions.set(regions[:i % 3])
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def dumped(self):
+        return get_serializer(ArticleSchema).dump_many(
+            plan_queryset(Article.objects.order_by("pk"), ArticleSchema)
+        )
+
+    def test_exports_and_imports_articles(self):
+        expected = self.dumped()
+        for name in ("articles.jsonl", "articles.jsonl.gz"):
+            with self.subTest(name=name):
+                path = os.path.join(self.directory.name, name)
+                stdout = io.StringIO()
+                call_command("export_articles", path, chunk_size=2, stdout=stdout)
+                self.assertIn("Exported 5 articles", stdout.getvalue())
+                opener = gzip.open if name.endswith(".gz") else open
+                with opener(path, "rb") as lines:
+                    self.assertEqual([json.loads(line) for line in lines], expected)
+
+                Article.objects.all().delete()
+                stdout = io.StringIO()
+                call_command("import_articles", path, chunk_size=2, stdout=stdout)
+                self.assertIn("Imported 5 articles", stdout.getvalue())
+                self.assertEqual(self.dumped(), expected)
+
+    def test_reports_invalid_lines(self):
+        path = os.path.join(self.directory.name, "articles.jsonl")
+        with open(path, "w") as lines:
+            lines.write(json.dumps({"title": "New", "regions": [{"code": "AL"}]}) + "\n")
+            lines.write("\n{invalid\n")
+            lines.write(json.dumps({"title": "Unknown region", "regions": [{"id": 999}]}) + "\n")
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command("import_articles", path, stdout=stdout, stderr=stderr)
+        self.assertIn("Imported 1 articles", stdout.getvalue())
+        self.assertIn("2 failed", stdout.getvalue())
+        self.assertIn("Line 3: invalid JSON", stderr.getvalue())
+        self.assertIn("Line 4: ", stderr.getvalue())
+        self.assertEqual(Article.objects.get(title="New").regions.get().code, "AL")
+
+
+class SeedDataCommandTestCase(TestCase):
+    def seed(self, **options):
+        options = {"authors": 3, "regions": 4, "articles": 25, "chunk_size": 10, **options}
+        stdout = io.StringIO()
+        call_command("seed_data", stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def test_creates_the_rows(self):
+        output = self.seed(fanout=2)
+        self.assertEqual(Author.objects.count(), 3)
+        self.assertEqual(Region.objects.count(), 4)
+        self.assertEqual(Article.objects.count(), 25)
+        self.assertEqual(Article.regions.through.objects.count(), 50)
+        self.assertFalse(Article.objects.filter(author=None).exists())
+        self.assertEqual({len(article.content) for article in Article.objects.all()}, {500})
+        self.assertIn("10/25 articles", output)
+        self.assertIn("Created 3 authors, 4 regions and 25 articles", output)
+
+    def test_same_seed_generates_the_same_articles(self):
+        def generate(seed):
+            self.seed(seed=seed, content_distribution="lognormal")
+            articles = list(Article.objects.order_by("pk").values_list("title", "content"))
+            Article.objects.all().delete()
+            Author.objects.all().delete()
+            Region.objects.all().delete()
+            return articles
+
+        self.assertEqual(generate(1), generate(1))
+        self.assertNotEqual(generate(1), generate(2))
+
+    def test_seeds_again(self):
+        self.seed()
+        self.seed()
+        self.assertEqual(Author.objects.count(), 6)
+        self.assertEqual(Region.objects.count(), 8)
+        self.assertEqual(Article.objects.count(), 50)
+
+    def test_rejects_invalid_options(self):
+        with self.assertRaisesMessage(CommandError, "two-letter region codes"):
+            self.seed(regions=677)
+        with self.assertRaisesMessage(CommandError, "--articles cannot be negative"):
+            self.seed(articles=-1)
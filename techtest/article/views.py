@@ -1,44 +1,112 @@
 import json
 
-from marshmallow import ValidationError
+from django.conf import settings
 from django.views.generic import View
 
+from techtest.article.bulk import upsert_articles
+from techtest.article.documents import ArticleDocumentListMixin, ArticleDocumentMixin
 from techtest.article.models import Article
 from techtest.article.schemas import ArticleSchema
+from techtest.article.search import SearchError, search_articles
+from techtest.author.models import Author
+from techtest.region.models import Region
 from techtest.utils import json_response
+from techtest.utils.async_views import AsyncViewMixin
+from techtest.utils.cache import ResponseCacheMixin
+from techtest.utils.fieldsets import FieldsetError, requested_fields
+from techtest.utils.filters import Filter, PrefixFilter, RangeFilter
+from techtest.utils.pagination import PaginationError
+from techtest.utils.replicas import ReplicaReadMixin
+from techtest.utils.values import get_values_serializer
+from techtest.utils.views import (
+    ListRetreiveAbstractView,
+    SinglePostAbstractView,
+    SinglePKInstanceAbstractView
+)
 
 
-class ArticlesListView(View):
-    def get(self, request, *args, **kwargs):
-        return json_response(ArticleSchema().dump(Article.objects.all(), many=True))
+ARTICLE_MODELS = (Article, Author, Region, Article.regions.through)
+
+
+class ArticlesListView(
+    ReplicaReadMixin,
+    ResponseCacheMixin,
+    ArticleDocumentListMixin,
+    ListRetreiveAbstractView,
+    SinglePostAbstractView,
+):
+    model = Article
+    model_schema = ArticleSchema
+    cache_models = ARTICLE_MODELS
+    use_values = True
+    filters = (
+        Filter("region", "regions__code"),
+        Filter("author", "author_id", int),
+        Filter("author_last_name", "author__last_name"),
+        PrefixFilter("title_prefix", "title"),
+        RangeFilter("id", cast=int),
+    )
+
 
+class ArticleView(ResponseCacheMixin, ArticleDocumentMixin, SinglePKInstanceAbstractView):
+    model = Article
+    model_schema = ArticleSchema
+    pk_url_kwarg = "article_id"
+    cache_models = ARTICLE_MODELS
+
+
+class ArticlesBulkView(View):
     def post(self, request, *args, **kwargs):
+        """Create or update a batch of articles, returning the per-article results"""
         try:
-            article = ArticleSchema().load(json.loads(request.body))
-        except ValidationError as e:
-            return json_response(e.messages, 400)
-        return json_response(ArticleSchema().dump(article), 201)
+            payloads = json.loads(request.body)
+        except ValueError:
+            return json_response({"error": "The body is not valid JSON"}, 400)
+        if not isinstance(payloads, list):
+            return json_response({"error": "A list of articles is expected"}, 400)
+        if len(payloads) > settings.BULK_MAX_ITEMS:
+            return json_response(
+                {"error": f"At most {settings.BULK_MAX_ITEMS} articles can be sent at once"}, 400
+            )
+        return json_response(upsert_articles(payloads))
 
 
-class ArticleView(View):
-    def dispatch(self, request, article_id, *args, **kwargs):
-        try:
-            self.article = Article.objects.get(pk=article_id)
-        except Article.DoesNotExist:
-            return json_response({"error": "No Article matches the given query"}, 404)
-        self.data = request.body and dict(json.loads(request.body), id=self.article.id)
-        return super(ArticleView, self).dispatch(request, *args, **kwargs)
+class ArticlesSearchView(ResponseCacheMixin, View):
+    cache_models = ARTICLE_MODELS
 
     def get(self, request, *args, **kwargs):
-        return json_response(ArticleSchema().dump(self.article))
-
-    def put(self, request, *args, **kwargs):
+        """Retrieve a page of the articles matching the q parameter, best ranked first"""
         try:
-            self.article = ArticleSchema().load(self.data)
-        except ValidationError as e:
-            return json_response(e.messages, 400)
-        return json_response(ArticleSchema().dump(self.article))
-
-    def delete(self, request, *args, **kwargs):
-        self.article.delete()
-        return json_response()
+            fieldset = requested_fields(ArticleSchema, request.GET)
+            page = search_articles(request)
+        except (FieldsetError, PaginationError, SearchError) as e:
+            return json_response({"error": str(e)}, 400)
+        serializer = get_values_serializer(ArticleSchema, Article, fieldset)
+        rows = {
+            row["id"]: row
+            for row in serializer.values(Article.objects.filter(pk__in=page.object_list))
+        }
+        # The articles deleted since the index lookup are left out
+        response = json_response(
+            serializer.dump_many(rows[pk] for pk in page.object_list if pk in rows)
+        )
+        link = page.link_header(request)
+        if link:
+            response["Link"] = link
+        return response
+
+
+class AsyncArticlesListView(AsyncViewMixin, ArticlesListView):
+    pass
+
+
+class AsyncArticleView(AsyncViewMixin, ArticleView):
+    pass
+
+
+class AsyncArticlesBulkView(AsyncViewMixin, ArticlesBulkView):
+    pass
+
+
+class AsyncArticlesSearchView(AsyncViewMixin, ArticlesSearchView):
+    pass
@@ -2,6 +2,7 @@
 ASGI config for techtest project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+The requests are routed with ``ASGI_URLCONF``, to the async views.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
@@ -9,8 +10,58 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+
+from techtest.utils.async_views import iterate_in_thread
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'techtest.settings')
 
-application = get_asgi_application()
+
+class AsyncViewsASGIHandler(ASGIHandler):
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None:
+            request.urlconf = settings.ASGI_URLCONF
+        return request, error_response
+
+    async def send_response(self, response, send):
+        """Send the response, producing the chunks of a streamed one out of the event loop
+
+        Django 3.2 iterates the streamed responses in the event loop, where
+        the ORM cannot run: their chunks are produced by ``iterate_in_thread``
+        instead, one at a time, so they are never held in memory at once.
+        """
+        if not response.streaming:
+            return await super().send_response(response, send)
+        headers = [
+            (
+                header.encode('ascii') if isinstance(header, str) else bytes(header),
+                value.encode('latin1') if isinstance(value, str) else bytes(value),
+            )
+            for header, value in response.items()
+        ]
+        headers += [
+            (b'Set-Cookie', cookie.output(header='').encode('ascii').strip())
+            for cookie in response.cookies.values()
+        ]
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': headers,
+        })
+        parts = iterate_in_thread(response)
+        try:
+            async for part in parts:
+                for chunk, _ in self.chunk_bytes(part):
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        finally:
+            await parts.aclose()
+        await send({'type': 'http.response.body'})
+        await sync_to_async(response.close, thread_sensitive=True)()
+
+
+django.setup(set_prefix=False)
+application = AsyncViewsASGIHandler()
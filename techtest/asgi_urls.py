@@ -0,0 +1,33 @@
+"""techtest URL Configuration of the ASGI application
+
+The same routes as `techtest.urls`, served by the async views.
+"""
+from django.contrib import admin
+from django.urls import path
+
+from techtest.article.views import (
+    AsyncArticleView,
+    AsyncArticlesBulkView,
+    AsyncArticlesListView,
+    AsyncArticlesSearchView,
+)
+from techtest.region.views import AsyncRegionView, AsyncRegionsListView
+from techtest.author.views import AsyncAuthorView, AsyncAuthorPKView
+from techtest.utils.async_views import AsyncMetricsView
+
+urlpatterns = [
+    path("admin/", admin.site.urls),
+
+    path("articles/", AsyncArticlesListView.as_view(), name="articles-list"),
+    path("articles/bulk/", AsyncArticlesBulkView.as_view(), name="articles-bulk"),
+    path("articles/search/", AsyncArticlesSearchView.as_view(), name="articles-search"),
+    path("articles/<int:article_id>/", AsyncArticleView.as_view(), name="article"),
+
+    path("regions/", AsyncRegionsListView.as_view(), name="regions-list"),
+    path("regions/<int:region_id>/", AsyncRegionView.as_view(), name="region"),
+
+    path("author/", AsyncAuthorView.as_view(), name="author-list"),
+    path("author/<int:pk>", AsyncAuthorPKView.as_view(), name="author"),
+
+    path("metrics/", AsyncMetricsView.as_view(), name="metrics"),
+]
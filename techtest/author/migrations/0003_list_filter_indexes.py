@@ -0,0 +1,17 @@
+# Generated by Django 3.2.7 on 2026-10-18 08:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('author', '0002_alter_author_unique_together'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='author',
+            index=models.Index(fields=['last_name', 'first_name'], name='author_last_first_name_idx'),
+        ),
+    ]
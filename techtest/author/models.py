@@ -9,4 +9,5 @@ class Author(models.Model):
         return f"<Author id={self.id} first_name={self.first_name} last_name={self.last_name}>"
 
     class Meta:
-        unique_together = (("first_name", "last_name"),)
\ No newline at end of file
+        unique_together = (("first_name", "last_name"),)
+        indexes = [models.Index(fields=["last_name", "first_name"], name="author_last_first_name_idx")]
\ No newline at end of file
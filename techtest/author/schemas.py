@@ -1,10 +1,14 @@
-from django.forms import ValidationError
 from marshmallow import validate
 from marshmallow import fields
 from marshmallow import Schema
 from marshmallow.decorators import post_load
+from marshmallow.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 
 from techtest.author.models import Author
+from techtest.utils.cache import invalidate_responses
+from techtest.utils.queryset import assign_changes
 
 
 class AuthorSchema(Schema):
@@ -17,25 +21,81 @@ class AuthorSchema(Schema):
 
     @post_load
     def update_or_create(self, data, *args, **kwargs):
-        author_id = data.pop("id", None)
-        partial = kwargs["partial"]
-        if not partial:
-            """ POST method """
-            if author_id:
-                author = Author.objects.get(
-                    id=author_id
-                )
-            if author:
-                raise ValidationError("The Author exists")
-            author = Author.objects.create(
-                id=author_id,
-                first_name=data["first_name"],
-                last_name=data["last_name"]
-            )
-            return author
-        else:
-            """ Put method """
-            author, _ = Author.objects.update_or_create(
-                id=data.pop("id", None), defaults=data
-            )
-            return author
+        """Update the author of the ``instance`` context in place, or create a new one
+
+        A new author always gets a new id, the id sent along is ignored.
+        """
+        data.pop("id", None)
+        instance = self.context.get("instance")
+        if instance is not None:
+            changed = assign_changes(instance, data)
+            if not changed:
+                return instance
+        try:
+            with transaction.atomic():
+                if instance is not None:
+                    instance.save(update_fields=changed)
+                    return instance
+                return Author.objects.create(**data)
+        except IntegrityError:
+            raise ValidationError("An author with this first and last name exists")
+
+
+def resolve_authors(payloads, create=True):
+    """Resolve the author payloads with a single lookup and a single bulk insert
+
+    A payload refers to an author by its ``id`` or by its unique first and
+    last name pair, the authors with an unknown name are created, or only
+    returned unsaved unless ``create``. Returns the authors in the order of
+    the payloads, ``None`` for the payloads matching no author and having no
+    name to create one with.
+    """
+    def name(payload):
+        if payload.get("first_name") is None or payload.get("last_name") is None:
+            return None
+        return payload["first_name"], payload["last_name"]
+
+    ids = {payload["id"] for payload in payloads if payload.get("id") is not None}
+    names = {name(payload) for payload in payloads} - {None}
+    if not ids and not names:
+        return [None] * len(payloads)
+    # The name pairs are matched in Python against the first and last names
+    # looked up with two IN clauses, as thousands of OR-ed pairs would overflow
+    # the SQL expression depth
+    authors = list(Author.objects.filter(
+        Q(id__in=ids)
+        | Q(first_name__in={first for first, _ in names}, last_name__in={last for _, last in names})
+    ))
+    by_id = {author.id: author for author in authors}
+    by_name = {(author.first_name, author.last_name): author for author in authors}
+
+    missing = {}
+    for payload in payloads:
+        key = name(payload)
+        if payload.get("id") in by_id or key is None or key in by_name:
+            continue
+        missing.setdefault(
+            key, Author(id=payload.get("id"), first_name=key[0], last_name=key[1])
+        )
+    if missing and create:
+        create_authors(missing.values())
+    return [
+        by_id.get(payload.get("id")) or by_name.get(name(payload)) or missing.get(name(payload))
+        for payload in payloads
+    ]
+
+
+def create_authors(authors):
+    """Insert the unsaved authors with a single bulk insert, setting their primary keys"""
+    authors = list(authors)
+    Author.objects.bulk_create(authors)
+    invalidate_responses(Author)
+    created = {
+        (author.first_name, author.last_name): author.pk
+        for author in Author.objects.filter(
+            first_name__in={author.first_name for author in authors},
+            last_name__in={author.last_name for author in authors},
+        ).only("pk", "first_name", "last_name")
+    }
+    for author in authors:
+        author.pk = created[author.first_name, author.last_name]
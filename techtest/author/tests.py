@@ -2,7 +2,9 @@ import json
 import random
 import string
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from techtest.author.models import Author
@@ -46,6 +48,18 @@ class AuthorListViewTestCase(TestCase):
             ],
         )
 
+    def test_filters_by_last_name(self):
+        response = self.client.get(self.url, {"last_name": self.author.last_name})
+        self.assertEqual([author["id"] for author in response.json()], [self.author.pk])
+        response = self.client.get(self.url, {"last_name": self.author.last_name, "first_name": "Other"})
+        self.assertEqual(response.json(), [])
+
+    def test_rejects_out_of_range_ids(self):
+        for params in ({"id_min": "99999999999999999999"}, {"id_max": str(2 ** 63)}):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+
     def test_creates_new_author(self):
         payload = {
             "first_name": "Test FN",
@@ -135,6 +149,41 @@ class AuthorViewTestCase(TestCase):
             },
         )
 
+    def test_unchanged_update_writes_nothing(self):
+        payload = {"first_name": self.author.first_name, "last_name": self.author.last_name}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.put(
+                self.url, data=json.dumps(payload), content_type="application/json"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 1)
+
+    def test_rejects_duplicate_names(self):
+        other = Author.objects.create(first_name="Other", last_name="Author")
+        payload = {"first_name": self.author.first_name, "last_name": self.author.last_name}
+        response = self.client.put(
+            reverse("author", kwargs={"pk": other.pk}),
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        other.refresh_from_db()
+        self.assertEqual(other.first_name, "Other")
+
+    def test_partially_updates_author(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(
+                self.url, data=json.dumps({"last_name": "Patched"}), content_type="application/json"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {"id": self.author.id, "first_name": self.author.first_name, "last_name": "Patched"},
+        )
+        updates = [query["sql"] for query in queries if query["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn("first_name", updates[0])
+
     def test_removes_author(self):
         response = self.client.delete(self.url)
         self.assertEqual(response.status_code, 200)
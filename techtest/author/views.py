@@ -1,6 +1,10 @@
 from django.shortcuts import render
 
 from techtest.author.models import Author
+from techtest.utils.async_views import AsyncViewMixin
+from techtest.utils.cache import ResponseCacheMixin
+from techtest.utils.filters import Filter, RangeFilter
+from techtest.utils.replicas import ReplicaReadMixin
 from techtest.utils.views import (
     ListRetreiveAbstractView,
     SinglePostAbstractView,
@@ -8,11 +12,27 @@ from techtest.utils.views import (
 )
 from techtest.author.schemas import AuthorSchema
 
-class AuthorView(ListRetreiveAbstractView, SinglePostAbstractView):
+class AuthorView(
+    ReplicaReadMixin, ResponseCacheMixin, ListRetreiveAbstractView, SinglePostAbstractView
+):
     
     model = Author
     model_schema = AuthorSchema
+    cache_models = (Author,)
+    use_values = True
+    filters = (
+        Filter("last_name"),
+        Filter("first_name"),
+        RangeFilter("id", cast=int),
+    )
 
-class AuthorPKView(SinglePKInstanceAbstractView):
+class AuthorPKView(ReplicaReadMixin, ResponseCacheMixin, SinglePKInstanceAbstractView):
     model = Author
-    model_schema = AuthorSchema
\ No newline at end of file
+    model_schema = AuthorSchema
+    cache_models = (Author,)
+
+class AsyncAuthorView(AsyncViewMixin, AuthorView):
+    pass
+
+class AsyncAuthorPKView(AsyncViewMixin, AuthorPKView):
+    pass
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class RegionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'techtest.region'
+
+    def ready(self):
+        from techtest.region import cache  # noqa: F401 connects the invalidation signals
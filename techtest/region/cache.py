@@ -0,0 +1,81 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from techtest.region.models import Region
+from techtest.utils.replicas import read_from_primary
+
+
+class RegionCache:
+    """In-process copy of the serialized region catalogue
+
+    The regions are a small and almost static table, loaded whole on first use
+    and kept until a region is saved or deleted in this process, or until
+    ``REGION_CACHE_TIMEOUT`` seconds passed, which bounds how long the writes
+    of the other processes go unnoticed. Every invalidation bumps ``version``.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._by_id = None
+        self._expires = 0
+
+    def _catalogue(self):
+        by_id = self._by_id
+        if by_id is not None and time.monotonic() < self._expires:
+            self.hits += 1
+            return by_id
+        self.misses += 1
+        with self._lock:
+            from techtest.region.schemas import RegionSchema
+            from techtest.utils.serializers import get_serializer
+
+            version = self.version
+            with read_from_primary():
+                by_id = {
+                    region["id"]: region
+                    for region in get_serializer(RegionSchema).dump_many(Region.objects.all())
+                }
+            # Do not keep a catalogue read while a region was being written
+            if version == self.version:
+                self._by_id = by_id
+                self._expires = time.monotonic() + settings.REGION_CACHE_TIMEOUT
+        return by_id
+
+    def invalidate(self):
+        self.version += 1
+        self._by_id = None
+
+    def load(self):
+        """Load the catalogue unless it is loaded already"""
+        self._catalogue()
+
+    def dump(self, region_ids):
+        """The serialized regions with the ids, skipping the unknown ones"""
+        by_id = self._catalogue()
+        if any(region_id not in by_id for region_id in region_ids):
+            self.invalidate()
+            by_id = self._catalogue()
+        return [by_id[region_id] for region_id in region_ids if region_id in by_id]
+
+    def stats(self):
+        return {"version": self.version, "hits": self.hits, "misses": self.misses}
+
+
+region_cache = RegionCache()
+
+
+@receiver(post_save, sender=Region)
+@receiver(post_delete, sender=Region)
+def invalidate_region_cache(**kwargs):
+    region_cache.invalidate()
+    # The catalogue may be reloaded before the transaction commits, from a
+    # connection that does not see the write yet
+    transaction.on_commit(region_cache.invalidate)
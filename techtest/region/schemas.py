@@ -2,13 +2,18 @@ from marshmallow import validate
 from marshmallow import fields
 from marshmallow import Schema
 from marshmallow.decorators import post_load
+from django.db.models import Q
 
+from techtest.region.cache import invalidate_region_cache, region_cache
 from techtest.region.models import Region
+from techtest.utils.cache import invalidate_responses
+from techtest.utils.queryset import update_instance
 
 
 class RegionSchema(Schema):
     class Meta(object):
         model = Region
+        cache = region_cache
 
     id = fields.Integer()
     code = fields.String(required=True, validate=validate.Length(equal=2))
@@ -16,7 +21,61 @@ class RegionSchema(Schema):
 
     @post_load
     def update_or_create(self, data, *args, **kwargs):
+        """Update the region of the ``instance`` context in place, or create or update by id"""
+        instance = self.context.get("instance")
+        if instance is not None:
+            data.pop("id", None)
+            update_instance(instance, data)
+            return instance
         region, _ = Region.objects.update_or_create(
             id=data.pop("id", None), defaults=data
         )
         return region
+
+
+def resolve_regions(payloads, create=True):
+    """Resolve the region payloads with a single lookup and a single bulk insert
+
+    A payload refers to a region by its ``id`` or by its unique ``code``, the
+    regions with an unknown code are created, or only returned unsaved unless
+    ``create``. Returns the regions in the order of the payloads, ``None`` for
+    the payloads matching no region and having no code to create one with.
+    """
+    ids = {payload["id"] for payload in payloads if payload.get("id") is not None}
+    codes = {payload["code"] for payload in payloads if payload.get("code")}
+    if not ids and not codes:
+        return [None] * len(payloads)
+    # Looked up in the database rather than in the catalogue cache, which may
+    # miss the deletions and code changes of the other processes
+    regions = list(Region.objects.filter(Q(id__in=ids) | Q(code__in=codes)))
+    by_id = {region.id: region for region in regions}
+    by_code = {region.code: region for region in regions}
+
+    missing = {}
+    for payload in payloads:
+        code = payload.get("code")
+        if payload.get("id") in by_id or not code or code in by_code:
+            continue
+        missing.setdefault(
+            code, Region(id=payload.get("id"), code=code, name=payload.get("name", ""))
+        )
+    if missing and create:
+        create_regions(missing.values())
+    return [
+        by_id.get(payload.get("id")) or by_code.get(payload.get("code"))
+        or missing.get(payload.get("code"))
+        for payload in payloads
+    ]
+
+
+def create_regions(regions):
+    """Insert the unsaved regions with a single bulk insert, setting their primary keys"""
+    regions = list(regions)
+    Region.objects.bulk_create(regions)
+    invalidate_region_cache()
+    invalidate_responses(Region)
+    created = dict(
+        Region.objects.filter(code__in={region.code for region in regions}).values_list("code", "pk")
+    )
+    for region in regions:
+        region.pk = created[region.code]
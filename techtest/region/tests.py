@@ -3,7 +3,9 @@ import json
 from django.test import TestCase
 from django.urls import reverse
 
+from techtest.region.cache import region_cache
 from techtest.region.models import Region
+from techtest.region.schemas import resolve_regions
 
 
 class RegionListViewTestCase(TestCase):
@@ -52,6 +54,12 @@ class RegionListViewTestCase(TestCase):
             response.json(),
         )
 
+    def test_streams_all_regions(self):
+        with self.settings(STREAM_CHUNK_SIZE=1):
+            response = self.client.get(self.url, {"stream": "1"})
+            regions = json.loads(b"".join(response.streaming_content))
+        self.assertEqual([region["code"] for region in regions], ["AL", "UK"])
+
 
 class RegionViewTestCase(TestCase):
     def setUp(self):
@@ -92,7 +100,69 @@ class RegionViewTestCase(TestCase):
             response.json(),
         )
 
+    def test_unchanged_update_writes_nothing(self):
+        with self.assertNumQueries(1):
+            response = self.client.put(
+                self.url, data=json.dumps({"code": "AL", "name": "Albania"}),
+                content_type="application/json",
+            )
+        self.assertEqual(response.json(), {"id": self.region.id, "code": "AL", "name": "Albania"})
+
+    def test_partially_updates_region(self):
+        response = self.client.patch(
+            self.url, data=json.dumps({"name": "Republic of Albania"}), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(), {"id": self.region.id, "code": "AL", "name": "Republic of Albania"}
+        )
+        self.region.refresh_from_db()
+        self.assertEqual(self.region.name, "Republic of Albania")
+
     def test_removes_region(self):
         response = self.client.delete(self.url)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(Region.objects.count(), 0)
+
+
+class RegionCacheTestCase(TestCase):
+    def setUp(self):
+        self.region = Region.objects.create(code="AL", name="Albania")
+        region_cache.load()
+
+    def test_serves_dumps_from_memory(self):
+        hits = region_cache.hits
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                region_cache.dump([self.region.id]),
+                [{"id": self.region.id, "code": "AL", "name": "Albania"}],
+            )
+        self.assertEqual(region_cache.hits, hits + 1)
+
+    def test_resolves_the_written_regions_from_the_database(self):
+        # Recoded by another process, unnoticed by the catalogue of this one
+        Region.objects.filter(pk=self.region.pk).update(code="AB")
+        with self.assertNumQueries(1):
+            self.assertEqual(resolve_regions([{"code": "AB"}]), [self.region])
+        self.assertEqual(region_cache.dump([self.region.id])[0]["code"], "AL")
+        self.assertEqual(resolve_regions([{"code": "AL"}], create=False)[0].pk, None)
+
+    def test_is_invalidated_by_region_writes(self):
+        version = region_cache.version
+        response = self.client.post(
+            reverse("regions-list"),
+            data=json.dumps({"code": "UK", "name": "United Kingdom"}),
+            content_type="application/json",
+        )
+        self.assertGreater(region_cache.version, version)
+        self.assertEqual(region_cache.dump([response.json()["id"]])[0]["code"], "UK")
+
+        self.client.put(
+            reverse("region", kwargs={"region_id": self.region.id}),
+            data=json.dumps({"code": "AL", "name": "Republic of Albania"}),
+            content_type="application/json",
+        )
+        self.assertEqual(region_cache.dump([self.region.id])[0]["name"], "Republic of Albania")
+
+        self.client.delete(reverse("region", kwargs={"region_id": self.region.id}))
+        self.assertEqual(region_cache.dump([self.region.id]), [])
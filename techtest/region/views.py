@@ -1,44 +1,35 @@
-import json
-
-from marshmallow import ValidationError
-from django.views.generic import View
-
 from techtest.region.models import Region
 from techtest.region.schemas import RegionSchema
-from techtest.utils import json_response
-
-
-class RegionsListView(View):
-    def get(self, request, *args, **kwargs):
-        return json_response(RegionSchema().dump(Region.objects.all(), many=True))
-
-    def post(self, request, *args, **kwargs):
-        try:
-            region = RegionSchema().load(json.loads(request.body))
-        except ValidationError as e:
-            return json_response(e.messages, 400)
-        return json_response(RegionSchema().dump(region), 201)
-
-
-class RegionView(View):
-    def dispatch(self, request, region_id, *args, **kwargs):
-        try:
-            self.region = Region.objects.get(pk=region_id)
-        except Region.DoesNotExist:
-            return json_response({"error": "No Region matches the given query"}, 404)
-        self.data = request.body and dict(json.loads(request.body), id=self.region.id)
-        return super(RegionView, self).dispatch(request, *args, **kwargs)
-
-    def get(self, request, *args, **kwargs):
-        return json_response(RegionSchema().dump(self.region))
-
-    def put(self, request, *args, **kwargs):
-        try:
-            self.region = RegionSchema().load(self.data)
-        except ValidationError as e:
-            return json_response(e.messages, 400)
-        return json_response(RegionSchema().dump(self.region))
-
-    def delete(self, request, *args, **kwargs):
-        self.region.delete()
-        return json_response()
+from techtest.utils.async_views import AsyncViewMixin
+from techtest.utils.cache import ResponseCacheMixin
+from techtest.utils.filters import Filter
+from techtest.utils.replicas import ReplicaReadMixin
+from techtest.utils.views import (
+    ListRetreiveAbstractView,
+    SinglePostAbstractView,
+    SinglePKInstanceAbstractView
+)
+
+
+class RegionsListView(
+    ReplicaReadMixin, ResponseCacheMixin, ListRetreiveAbstractView, SinglePostAbstractView
+):
+    model = Region
+    model_schema = RegionSchema
+    cache_models = (Region,)
+    filters = (Filter("code"),)
+
+
+class RegionView(ResponseCacheMixin, SinglePKInstanceAbstractView):
+    model = Region
+    model_schema = RegionSchema
+    pk_url_kwarg = "region_id"
+    cache_models = (Region,)
+
+
+class AsyncRegionsListView(AsyncViewMixin, RegionsListView):
+    pass
+
+
+class AsyncRegionView(AsyncViewMixin, RegionView):
+    pass
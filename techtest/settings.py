@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -40,9 +43,13 @@ INSTALLED_APPS = [
     'techtest.article',
     'techtest.region',
     'techtest.author',
+    'techtest.utils',
 ]
 
 MIDDLEWARE = [
+    'techtest.utils.metrics.MetricsMiddleware',
+    'techtest.utils.compression.CompressionMiddleware',
+    'techtest.utils.replicas.PrimaryPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -72,15 +79,120 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'techtest.wsgi.application'
 
+# The URLconf of the ASGI application, routing to the async views
+ASGI_URLCONF = 'techtest.asgi_urls'
+
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
+# DATABASE_PROFILE selects the configuration from the environment. The
+# "development" default opens a connection to the SQLite file per request.
+# "production" keeps the connections open for DATABASE_CONN_MAX_AGE seconds,
+# checked at the start of the requests, with either SQLite (DATABASE_ENGINE
+# "sqlite"): in WAL mode so the writers do not block the readers, with the
+# SQLITE_PRAGMAS applied on connect, and write transactions waiting up to
+# DATABASE_BUSY_TIMEOUT seconds for the lock; or PostgreSQL ("postgresql",
+# needs psycopg2) from the POSTGRES_* variables, optionally through a PgBouncer
+# pool ("pgbouncer" DATABASE_POOLER)
+
+DATABASE_PROFILE = os.environ.get('DATABASE_PROFILE', 'development')
+DATABASE_ENGINE = os.environ.get('DATABASE_ENGINE', 'sqlite')
+DATABASE_POOLER = os.environ.get('DATABASE_POOLER', '')
+DATABASE_CONN_MAX_AGE = int(os.environ.get('DATABASE_CONN_MAX_AGE', '600'))
+DATABASE_BUSY_TIMEOUT = float(os.environ.get('DATABASE_BUSY_TIMEOUT', '20'))
+DATABASE_HEALTH_CHECKS = DATABASE_PROFILE == 'production'
+
+SQLITE_PATH = os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3')
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    # Durable at the checkpoints rather than at every commit, which WAL keeps consistent
+    'synchronous': 'NORMAL',
+    # In KiB when negative, per connection
+    'cache_size': -64000,
+    'temp_store': 'MEMORY',
+    'mmap_size': 256 * 2 ** 20,
+}
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+if DATABASE_PROFILE == 'development':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': SQLITE_PATH,
+        }
+    }
+elif DATABASE_PROFILE == 'production' and DATABASE_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'techtest.utils.sqlite3',
+            'NAME': SQLITE_PATH,
+            'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,
+            'OPTIONS': {
+                'timeout': DATABASE_BUSY_TIMEOUT,
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': ';'.join(
+                    f'PRAGMA {name} = {value}' for name, value in SQLITE_PRAGMAS.items()
+                ),
+            },
+        }
     }
+elif DATABASE_PROFILE == 'production' and DATABASE_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'techtest'),
+            'USER': os.environ.get('POSTGRES_USER', 'techtest'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,
+            # PgBouncer hands the server connections over at every transaction
+            # end, where the server-side cursors of iterator() cannot follow
+            'DISABLE_SERVER_SIDE_CURSORS': DATABASE_POOLER == 'pgbouncer',
+            'OPTIONS': {'connect_timeout': 5},
+        }
+    }
+else:
+    raise ImproperlyConfigured(
+        f'Unknown database profile {DATABASE_PROFILE!r} with engine {DATABASE_ENGINE!r}'
+    )
+
+# Read replicas: DATABASE_REPLICAS lists, comma separated, the SQLite files or
+# the PostgreSQL hosts of the replicas of the primary, configured like it as
+# the "replica_<n>" aliases. The GET requests of the list and author views
+# read from them, but for the clients that wrote in the last
+# DATABASE_REPLICA_LAG seconds, the most the replicas are expected to lag
+# behind. Locally, the replicate_sqlite command copies the primary SQLite file
+# into the replica ones
+
+DATABASE_REPLICA_LAG = float(os.environ.get('DATABASE_REPLICA_LAG', '5'))
+if DATABASE_REPLICA_LAG <= 0:
+    raise ImproperlyConfigured('DATABASE_REPLICA_LAG must be a positive number of seconds')
+DATABASE_READ_REPLICAS = []
+for number, replica in enumerate(filter(None, os.environ.get('DATABASE_REPLICAS', '').split(',')), 1):
+    location = 'HOST' if DATABASES['default']['ENGINE'].endswith('postgresql') else 'NAME'
+    DATABASES[f'replica_{number}'] = dict(
+        DATABASES['default'], **{location: replica.strip()}, TEST={'MIRROR': 'default'}
+    )
+    DATABASE_READ_REPLICAS.append(f'replica_{number}')
+
+DATABASE_ROUTERS = ['techtest.utils.replicas.ReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# The local-memory backend is per process: with several processes, point the
+# responses cache to a shared backend (Memcached, Redis, database) so that the
+# writes of every process invalidate the responses of the others
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'responses',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
 }
 
 
@@ -126,3 +238,61 @@ STATIC_URL = '/static/'
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# List endpoints
+# Keyset pagination page sizes, and rows serialized per chunk of the
+# streamed (?stream=true) list responses
+
+PAGINATION_PAGE_SIZE = 100
+PAGINATION_MAX_PAGE_SIZE = 1000
+
+STREAM_CHUNK_SIZE = 500
+
+
+# Maximum number of articles of a single bulk upsert request
+
+BULK_MAX_ITEMS = 5000
+
+
+# Seconds the in-process region catalogue is kept, bounding how long the region
+# writes made by the other processes go unnoticed
+
+REGION_CACHE_TIMEOUT = 300
+
+
+# GET responses cache: the cache alias storing the responses and the models
+# versions they are keyed with, and the seconds the responses are kept
+
+RESPONSE_CACHE_ENABLED = True
+RESPONSE_CACHE_ALIAS = 'responses'
+RESPONSE_CACHE_TIMEOUT = 600
+
+
+# Whether the async views run their synchronous work in the single thread
+# shared by all the requests, rather than in a pool of threads with their own
+# database connections
+
+ASYNC_VIEWS_THREAD_SENSITIVE = False
+
+
+# Dotted path of the JSON encoder class of the responses, the orjson encoder
+# when the package is installed and the standard library one otherwise if None
+
+JSON_ENCODER = None
+
+
+# Whether the article views serve the full article documents from the
+# ArticleDocument read model, which is then maintained on every write. Run the
+# rebuild_article_documents command after enabling it
+
+ARTICLE_DOCUMENTS_ENABLED = False
+
+
+# Compression of the JSON responses: the smallest body compressed, in bytes,
+# and the levels of gzip and of brotli (used when the brotli package is
+# installed), traded between CPU time and bytes saved
+
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
@@ -16,14 +16,22 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path
 
-from techtest.article.views import ArticleView, ArticlesListView
+from techtest.article.views import (
+    ArticleView,
+    ArticlesBulkView,
+    ArticlesListView,
+    ArticlesSearchView,
+)
 from techtest.region.views import RegionView, RegionsListView
 from techtest.author.views import AuthorView, AuthorPKView
+from techtest.utils.views import MetricsView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
 
     path("articles/", ArticlesListView.as_view(), name="articles-list"),
+    path("articles/bulk/", ArticlesBulkView.as_view(), name="articles-bulk"),
+    path("articles/search/", ArticlesSearchView.as_view(), name="articles-search"),
     path("articles/<int:article_id>/", ArticleView.as_view(), name="article"),
 
     path("regions/", RegionsListView.as_view(), name="regions-list"),
@@ -31,4 +39,6 @@ urlpatterns = [
 
     path("author/", AuthorView.as_view(), name="author-list"),
     path("author/<int:pk>", AuthorPKView.as_view(), name="author"),
+
+    path("metrics/", MetricsView.as_view(), name="metrics"),
 ]
@@ -1 +1 @@
-from .response import json_response
\ No newline at end of file
+from .response import json_response, json_stream_response
\ No newline at end of file
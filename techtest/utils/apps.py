@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class UtilsConfig(AppConfig):
+    name = 'techtest.utils'
+
+    def ready(self):
+        from techtest.utils import cache, database, metrics
+        cache.connect_signals()
+        database.connect_signals()
+        metrics.connect_signals()
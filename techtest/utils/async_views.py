@@ -0,0 +1,113 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.utils.decorators import classonlymethod
+from django.views.generic import View
+
+from techtest.utils.database import check_connections
+from techtest.utils.views import (
+    ListRetreiveAbstractView,
+    MetricsView,
+    SinglePostAbstractView,
+    SinglePKInstanceAbstractView
+)
+
+
+def run_in_thread(function, *args, **kwargs):
+    """Await the synchronous function, run in a worker thread
+
+    With ``ASYNC_VIEWS_THREAD_SENSITIVE`` the function runs in the single
+    thread Django runs all the synchronous code of the requests in, otherwise
+    in a thread of a pool, so the requests of a worker are served
+    concurrently. The pool threads then check and close their database
+    connections like the start and the end of a request do.
+    """
+    if settings.ASYNC_VIEWS_THREAD_SENSITIVE:
+        return sync_to_async(function)(*args, **kwargs)
+
+    def run():
+        check_connections()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(run, thread_sensitive=False)()
+
+
+class AsyncViewMixin(View):
+    """Serve the view from a coroutine, with all its synchronous work in one thread hop
+
+    The whole synchronous ``dispatch`` (the response cache lookups, the ORM
+    queries, the serialization) runs in a single ``run_in_thread`` call, so
+    a request only holds a thread while that work runs.
+    Django 3.2 iterates the streamed responses in the event loop, where the
+    ORM cannot run, so the ASGI application of ``techtest.asgi`` produces
+    their chunks with ``iterate_in_thread`` instead.
+
+    The mixin comes first in the bases of a view, before the other mixins
+    overriding ``dispatch``, which then run in the thread as well.
+    """
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            return await view(request, *args, **kwargs)
+
+        # Django 3.2 only serves the views that are coroutine functions as async
+        return functools.wraps(view)(async_view)
+
+    async def dispatch(self, request, *args, **kwargs):
+        return await run_in_thread(self.sync_dispatch, request, *args, **kwargs)
+
+    def sync_dispatch(self, request, *args, **kwargs):
+        return super().dispatch(request, *args, **kwargs)
+
+
+async def iterate_in_thread(iterable):
+    """Iterate the synchronous iterable from a coroutine, producing its items out of the event loop
+
+    The items are produced one at a time, as they are consumed, and all in
+    the same thread, where the database cursors of a streamed response stay
+    usable: the thread of the synchronous code with
+    ``ASYNC_VIEWS_THREAD_SENSITIVE``, otherwise a thread of their own, whose
+    database connections are closed once the iteration ends.
+    """
+    iterator = iter(iterable)
+    done = object()
+    if settings.ASYNC_VIEWS_THREAD_SENSITIVE:
+        produce = sync_to_async(next)
+        while (item := await produce(iterator, done)) is not done:
+            yield item
+        return
+
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        while (item := await loop.run_in_executor(executor, next, iterator, done)) is not done:
+            yield item
+    finally:
+        await loop.run_in_executor(executor, connections.close_all)
+        executor.shutdown(wait=False)
+
+
+class AsyncListRetreiveAbstractView(AsyncViewMixin, ListRetreiveAbstractView):
+    """The async abstract class to retrieve a list of model instances values"""
+
+
+class AsyncSinglePostAbstractView(AsyncViewMixin, SinglePostAbstractView):
+    """The async abstract view class to create a single model instance"""
+
+
+class AsyncSinglePKInstanceAbstractView(AsyncViewMixin, SinglePKInstanceAbstractView):
+    """The async abstract view class to work with instances by their primary key"""
+
+
+class AsyncMetricsView(AsyncViewMixin, MetricsView):
+    pass
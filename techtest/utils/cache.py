@@ -0,0 +1,182 @@
+import hashlib
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.http.response import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+from django.views.generic import View
+
+
+# The models the cached responses are built from, whose writes invalidate them
+CACHED_MODELS = ("article.Article", "article.Article_regions", "author.Author", "region.Region")
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def version_key(model):
+    return f"version:{model._meta.label_lower}"
+
+
+def get_versions(models):
+    """The current version of each model, as stored in the cache backend
+
+    The missing versions are started from the current time rather than from
+    zero, so a version evicted from the backend cannot come back to a value
+    the cached responses were keyed with.
+    """
+    cache = get_cache()
+    keys = [version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns())
+            versions[key] = cache.get(key)
+    return tuple(versions[key] for key in keys)
+
+
+def bump_versions(*models):
+    """Move the models to a new version, invalidating the responses built from them"""
+    cache = get_cache()
+    for model in models:
+        try:
+            cache.incr(version_key(model))
+        except ValueError:
+            cache.set(version_key(model), time.time_ns())
+
+
+def invalidate_responses(sender, **kwargs):
+    """Invalidate the responses built from the model, connected to its write signals"""
+    if kwargs.get("action", "post_").startswith("post_"):
+        bump_versions(sender)
+        # A response read before the transaction commits would be cached with
+        # the new version
+        transaction.on_commit(lambda: bump_versions(sender))
+
+
+def connect_signals():
+    for label in CACHED_MODELS:
+        model = apps.get_model(label)
+        for signal in (post_save, post_delete, m2m_changed):
+            signal.connect(invalidate_responses, sender=model, dispatch_uid=f"response_cache_{label}")
+
+
+class ResponseCache:
+    """Cache of the serialized GET responses in a Django cache backend
+
+    The responses are keyed by their scheme, host, path and query string (the
+    links of the paginated ones are absolute), and by the versions of the models they are built from: a save or a delete of any of
+    these models moves it to a new version, so the stale responses are never
+    looked up again and are left to the backend eviction.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def key(self, request, versions):
+        query = "&".join(sorted(request.META.get("QUERY_STRING", "").split("&")))
+        url = f"{request.scheme}://{request.get_host()}{request.path}?{query}"
+        digest = hashlib.md5(url.encode()).hexdigest()
+        key = f"response:{digest}:{'.'.join(str(version) for version in versions)}"
+        if getattr(request, "read_alias", None) is not None:
+            # Read from a replica, which may lag behind the versions: the
+            # response is only reused, and its ETag only matches, within a
+            # window of the replication lag
+            key += f":replica:{int(time.time() // settings.DATABASE_REPLICA_LAG)}"
+        return key
+
+    def etag(self, request, versions):
+        """Strong ETag of the response to the request, built from the models at these versions"""
+        return f'"{hashlib.md5(self.key(request, versions).encode()).hexdigest()}"'
+
+    def get(self, request, versions):
+        """The cached response to the request, built from the models at these versions"""
+        cached = get_cache().get(self.key(request, versions))
+        with self._lock:
+            if cached is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if cached is None:
+            return None
+        content, headers = cached
+        response = HttpResponse(content=content)
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    def set(self, request, versions, response):
+        headers = {
+            header: response[header]
+            for header in ("Content-Type", "Link") if response.has_header(header)
+        }
+        get_cache().set(
+            self.key(request, versions),
+            (response.content, headers),
+            settings.RESPONSE_CACHE_TIMEOUT,
+        )
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+response_cache = ResponseCache()
+
+
+class ResponseCacheMixin(View):
+    """Serve the GET responses from the response cache, with conditional GET support
+
+    ``cache_models`` are the models the responses are built from, whose
+    writes invalidate them. The responses get an ETag computed from the
+    versions of these models, so a matching ``If-None-Match`` is answered
+    with a 304 Not Modified before any database access or serialization.
+    """
+
+    cache_models = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != "GET" or not self.cache_models:
+            return super().dispatch(request, *args, **kwargs)
+        # The models versions are read before the database, the response is
+        # then at least as recent as the versions it is tagged and stored with
+        versions = get_versions(self.cache_models)
+        etag = response_cache.etag(request, versions)
+        # If-None-Match compares weakly, the compressed responses have weak ETags
+        if_none_match = {
+            tag.removeprefix("W/") for tag in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", ""))
+        }
+        if etag in if_none_match:
+            return self.not_modified(etag)
+
+        response = None
+        if settings.RESPONSE_CACHE_ENABLED:
+            response = response_cache.get(request, versions)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if (
+                settings.RESPONSE_CACHE_ENABLED
+                and response.status_code == 200
+                and not response.streaming
+                and get_versions(self.cache_models) == versions
+            ):
+                response_cache.set(request, versions, response)
+        if response.status_code != 200:
+            return response
+        # Only once the view found the representation, which may not exist
+        if "*" in if_none_match:
+            return self.not_modified(etag)
+        response["ETag"] = etag
+        return response
+
+    def not_modified(self, etag):
+        response = HttpResponseNotModified()
+        response["ETag"] = etag
+        return response
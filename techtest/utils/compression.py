@@ -0,0 +1,119 @@
+import gzip
+import re
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from techtest.utils.cache import get_cache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+accept_encoding_re = re.compile(r"^\s*([^\s;]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$")
+
+
+def supported_encodings():
+    """The content codings the responses can be compressed with, the preferred first"""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding):
+    """The supported content coding the ``Accept-Encoding`` header prefers, None for identity"""
+    weights = {}
+    for item in accept_encoding.split(","):
+        match = accept_encoding_re.match(item)
+        if match:
+            try:
+                weights[match[1].lower()] = float(match[2] or 1)
+            except ValueError:
+                continue
+    best = None
+    for encoding in supported_encodings():
+        weight = weights.get(encoding, weights.get("*", 0))
+        if weight > 0 and (best is None or weight > best[1]):
+            best = encoding, weight
+    return best and best[0]
+
+
+def compress(content, encoding):
+    if encoding == "br":
+        return brotli.compress(content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    # No modification time in the header, so the same content is compressed to the same bytes
+    return gzip.compress(content, settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def compress_stream(chunks, encoding):
+    """Compress the chunks, flushing the compressed bytes of every chunk as it comes"""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        for chunk in chunks:
+            compressed = compressor.process(chunk) + compressor.flush()
+            if compressed:
+                yield compressed
+        yield compressor.finish()
+        return
+    # A gzip container (wbits 16 + 15) written by a single deflate stream
+    compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def compressed_key(etag, encoding):
+    return f"compressed:{encoding}:{etag}"
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compress the JSON responses with the coding the ``Accept-Encoding`` header prefers
+
+    Brotli is preferred when the ``brotli`` package is installed, gzip is used
+    otherwise. The responses shorter than ``COMPRESSION_MIN_SIZE`` are sent
+    as they are, the streamed ones are compressed chunk by chunk. The bodies
+    tagged by the response cache are compressed once per coding: their ETag
+    identifies their content, so the compressed bytes are cached along the
+    responses and reused until the models change.
+
+    Like Django's GZipMiddleware, the ETags of the compressed responses are
+    made weak, as their bytes differ from the identity ones.
+    """
+
+    def process_response(self, request, response):
+        if (
+            response.has_header("Content-Encoding")
+            or not response.get("Content-Type", "").startswith("application/json")
+            or (not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE)
+        ):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = negotiate_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(response.streaming_content, encoding)
+            del response["Content-Length"]
+        else:
+            response.content = self.compressed_content(response, encoding)
+            response["Content-Length"] = str(len(response.content))
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = encoding
+        return response
+
+    def compressed_content(self, response, encoding):
+        etag = response.get("ETag")
+        if not etag or not settings.RESPONSE_CACHE_ENABLED:
+            return compress(response.content, encoding)
+        key = compressed_key(etag, encoding)
+        content = get_cache().get(key)
+        if content is None:
+            content = compress(response.content, encoding)
+            get_cache().set(key, content, settings.RESPONSE_CACHE_TIMEOUT)
+        return content
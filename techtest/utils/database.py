@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+
+
+def check_connections(**kwargs):
+    """Close the persistent connections that stopped working, so they are opened again
+
+    Django 3.2 only checks the connections that raised an error, a database
+    restart or a dropped idle connection would make the next request of
+    every worker fail. Like the ``CONN_HEALTH_CHECKS`` of later versions,
+    with ``DATABASE_HEALTH_CHECKS`` the open connections are checked at the
+    start of the requests, at the cost of a round trip each.
+    """
+    if not settings.DATABASE_HEALTH_CHECKS:
+        return
+    for connection in connections.all():
+        if (
+            connection.connection is not None
+            and not connection.in_atomic_block
+            and not connection.is_usable()
+        ):
+            connection.close()
+
+
+def connect_signals():
+    # After close_old_connections, connected by Django, closed the obsolete ones
+    request_started.connect(check_connections, dispatch_uid="database_check_connections")
@@ -0,0 +1,57 @@
+import functools
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# The JSON-native form of the values the JSON types do not cover: dates and
+# times, decimals, UUIDs and lazy translation strings are encoded like
+# DjangoJSONEncoder does, whatever the encoder
+default = DjangoJSONEncoder().default
+
+
+class StdlibJSONEncoder:
+    """Encode with the standard library ``json`` module"""
+
+    def dumps(self, data) -> bytes:
+        return json.dumps(data, default=default).encode()
+
+
+class OrjsonEncoder:
+    """Encode with ``orjson``, straight to bytes
+
+    The datetimes are passed to ``default`` and the non-string keys are
+    converted, so the documents are the same as the standard library ones,
+    but for the whitespace.
+    """
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("The orjson JSON encoder needs the orjson package")
+        self.option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, data) -> bytes:
+        return orjson.dumps(data, default=default, option=self.option)
+
+
+@functools.lru_cache(maxsize=None)
+def get_encoder():
+    """The ``JSON_ENCODER`` encoder, or else the fastest installed one"""
+    if settings.JSON_ENCODER:
+        return import_string(settings.JSON_ENCODER)()
+    return OrjsonEncoder() if orjson is not None else StdlibJSONEncoder()
+
+
+@receiver(setting_changed)
+def reset_encoder(setting, **kwargs):
+    if setting == "JSON_ENCODER":
+        get_encoder.cache_clear()
@@ -0,0 +1,42 @@
+from marshmallow import Schema
+
+
+class FieldsetError(ValueError):
+    """The fieldset parameters of the request are not valid"""
+
+
+def schema_relations(schema: Schema):
+    """Names of the relations the schema declares in its ``Meta``"""
+    meta = getattr(schema, "Meta", None)
+    return {*getattr(meta, "select_related", {}), *getattr(meta, "prefetch_related", {})}
+
+
+def split_param(query, param):
+    return [name for value in query.getlist(param) for name in value.split(",") if name]
+
+
+def requested_fields(schema: Schema, query):
+    """The schema fields the ``fields`` and ``expand`` query parameters select, None for all
+
+    ``fields`` lists the fields to serialize, and defaults to all the fields
+    but the relations. ``expand`` lists the relations to serialize along. So
+    once either parameter is given, the relations are only serialized (and
+    loaded) when they are listed.
+    """
+    if "fields" not in query and "expand" not in query:
+        return None
+    declared = list(schema().dump_fields)
+    relations = schema_relations(schema)
+    unknown = [name for name in split_param(query, "fields") if name not in declared]
+    unknown += [name for name in split_param(query, "expand") if name not in relations]
+    if unknown:
+        raise FieldsetError(f"Unknown fields: {', '.join(unknown)}")
+
+    if "fields" in query:
+        selected = set(split_param(query, "fields"))
+    else:
+        selected = {name for name in declared if name not in relations}
+    selected.update(split_param(query, "expand"))
+    if not selected:
+        raise FieldsetError("No field is selected")
+    return tuple(name for name in declared if name in selected)
@@ -0,0 +1,101 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+
+
+class FilterError(ValueError):
+    """The filter parameters of the request are not valid"""
+
+
+# The range of the integers the database columns hold, signed 64-bit ones
+INTEGER_RANGE = range(-(2 ** 63), 2 ** 63)
+
+
+class Filter:
+    """Declarative filter of a list view on a query parameter
+
+    The parameter values select the rows whose ``field`` (a field path, which
+    may span relations) equals one of them, after conversion with ``cast``.
+    The filters spanning a many-to-many relation select the primary keys of
+    the matching rows in a subquery, so the rows are not repeated.
+    """
+
+    def __init__(self, param, field=None, cast=str):
+        self.param = param
+        self.field = field or param
+        self.cast = cast
+
+    def convert(self, value):
+        try:
+            converted = self.cast(value)
+        except (TypeError, ValueError, OverflowError):
+            raise FilterError(f"Invalid {self.param} value: {value!r}")
+        # The queries on the integers the columns cannot hold overflow
+        if isinstance(converted, int) and converted not in INTEGER_RANGE:
+            raise FilterError(f"Invalid {self.param} value: {value!r}")
+        return converted
+
+    def lookups(self, values):
+        if len(values) == 1:
+            return {self.field: values[0]}
+        return {f"{self.field}__in": values}
+
+    def filter(self, queryset: models.QuerySet, query):
+        values = [self.convert(value) for value in query.getlist(self.param)]
+        if not values:
+            return queryset
+        lookups = self.lookups(values)
+        if self.spans_many(queryset.model):
+            return queryset.filter(pk__in=queryset.model.objects.filter(**lookups).values("pk"))
+        return queryset.filter(**lookups)
+
+    def spans_many(self, model):
+        for name in self.field.split("__"):
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                return False
+            if field.many_to_many or field.one_to_many:
+                return True
+            if not field.is_relation:
+                return False
+            model = field.related_model
+        return False
+
+
+class PrefixFilter(Filter):
+    """Filter on a case-sensitive prefix of a string field
+
+    The prefix is translated to a ``>= prefix AND < next prefix`` range, which
+    an index on the field serves where a ``LIKE 'prefix%'`` would not.
+    """
+
+    def lookups(self, values):
+        if len(values) > 1:
+            raise FilterError(f"A single {self.param} value is expected")
+        prefix = values[0]
+        if not prefix:
+            return {}
+        lookups = {f"{self.field}__gte": prefix}
+        if prefix[-1] != chr(0x10FFFF):
+            lookups[f"{self.field}__lt"] = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        else:
+            lookups[f"{self.field}__startswith"] = prefix
+        return lookups
+
+
+class RangeFilter(Filter):
+    """Filter on an inclusive range of a field, from the ``<param>_min`` and ``<param>_max`` parameters"""
+
+    def filter(self, queryset: models.QuerySet, query):
+        for suffix, lookup in (("min", "gte"), ("max", "lte")):
+            value = query.get(f"{self.param}_{suffix}")
+            if value is not None:
+                queryset = queryset.filter(**{f"{self.field}__{lookup}": self.convert(value)})
+        return queryset
+
+
+def filter_queryset(queryset: models.QuerySet, filters, query):
+    """The queryset filtered by the declared filters, from the query parameters"""
+    for declared in filters:
+        queryset = declared.filter(queryset, query)
+    return queryset
@@ -0,0 +1,33 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from techtest.utils.replicas import replicate_sqlite
+
+
+class Command(BaseCommand):
+    help = "Copy the primary SQLite database into the replica files, standing in for a replication"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval", type=float, default=0,
+            help="Seconds between the copies, copied once when 0",
+        )
+
+    def handle(self, *args, interval, **options):
+        if not settings.DATABASE_READ_REPLICAS:
+            raise CommandError("No replica configured, set DATABASE_REPLICAS")
+        while True:
+            started = time.monotonic()
+            try:
+                replicate_sqlite()
+            except ValueError as error:
+                raise CommandError(error)
+            self.stdout.write(
+                f"Replicated to {', '.join(settings.DATABASE_READ_REPLICAS)}"
+                f" in {time.monotonic() - started:.3f}s"
+            )
+            if not interval:
+                return
+            time.sleep(interval)
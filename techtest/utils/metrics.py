@@ -0,0 +1,236 @@
+import asyncio
+import bisect
+import contextlib
+import contextvars
+import threading
+import time
+
+from django.db.backends.signals import connection_created
+
+# The upper bounds of the histograms buckets
+DURATION_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERIES_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (1 << 10, 1 << 12, 1 << 14, 1 << 16, 1 << 18, 1 << 20, 1 << 22)
+
+# The metrics of the request being served, None outside of the requests
+current_metrics = contextvars.ContextVar("current_metrics", default=None)
+
+
+class RequestMetrics:
+    """The measures of a single request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.duration = None
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.size = None
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.started
+
+    def server_timing(self):
+        """The ``Server-Timing`` header value, in milliseconds"""
+        metrics = [
+            f"app;dur={self.duration * 1000:.2f}",
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries"',
+            f"serialize;dur={self.serialize_time * 1000:.2f}",
+        ]
+        if self.size is not None:
+            metrics.append(f'size;desc="{self.size} bytes"')
+        return ", ".join(metrics)
+
+
+class Histogram:
+    """Cumulative histogram of the observed values, with a bucket per upper bound"""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def as_dict(self):
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip((*self.bounds, "+Inf"), self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {"count": self.count, "sum": round(self.sum, 3), "buckets": buckets}
+
+
+class RouteMetrics:
+    """The histograms of the requests of a route"""
+
+    def __init__(self):
+        self.errors = 0
+        self.duration_ms = Histogram(DURATION_BUCKETS_MS)
+        self.queries = Histogram(QUERIES_BUCKETS)
+        self.db_ms = Histogram(DURATION_BUCKETS_MS)
+        self.serialize_ms = Histogram(DURATION_BUCKETS_MS)
+        self.size_bytes = Histogram(SIZE_BUCKETS)
+
+    def observe(self, metrics, status):
+        if status >= 500:
+            self.errors += 1
+        self.duration_ms.observe(metrics.duration * 1000)
+        self.queries.observe(metrics.queries)
+        self.db_ms.observe(metrics.db_time * 1000)
+        self.serialize_ms.observe(metrics.serialize_time * 1000)
+        if metrics.size is not None:
+            self.size_bytes.observe(metrics.size)
+
+    def as_dict(self):
+        return {
+            "errors": self.errors,
+            **{
+                name: getattr(self, name).as_dict()
+                for name in ("duration_ms", "queries", "db_ms", "serialize_ms", "size_bytes")
+            },
+        }
+
+
+class MetricsRegistry:
+    """The request metrics aggregated by URL name, in this process"""
+
+    def __init__(self):
+        self.routes = {}
+        self._lock = threading.Lock()
+
+    def observe(self, route, metrics, status):
+        with self._lock:
+            if route not in self.routes:
+                self.routes[route] = RouteMetrics()
+            self.routes[route].observe(metrics, status)
+
+    def as_dict(self):
+        with self._lock:
+            return {route: self.routes[route].as_dict() for route in sorted(self.routes)}
+
+    def reset(self):
+        with self._lock:
+            self.routes = {}
+
+
+registry = MetricsRegistry()
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper adding the queries and their time to the current request"""
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - start
+
+
+def install_query_recorder(connection, **kwargs):
+    # On every connection rather than around the requests, as the async views
+    # query from the connections of other threads
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def connect_signals():
+    connection_created.connect(install_query_recorder, dispatch_uid="metrics_query_recorder")
+
+
+@contextlib.contextmanager
+def serialization_timer():
+    """Add the time spent in the block to the serialization time of the current request"""
+    metrics = current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serialize_time += time.perf_counter() - start
+
+
+def route_name(request):
+    match = getattr(request, "resolver_match", None)
+    return (match.url_name or match.view_name) if match else "unmatched"
+
+
+class MetricsMiddleware:
+    """Measure the requests, reporting them in a ``Server-Timing`` header and in the registry
+
+    The measures are the wall time, the number and time of the database
+    queries, the time spent encoding JSON and the response size. A streamed
+    response is measured until it is exhausted, so its header only reports the
+    time to its first byte, and the registry its whole duration and size.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.process_response(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.process_response(request, response, metrics)
+
+    def process_response(self, request, response, metrics):
+        metrics.finish()
+        if not response.streaming:
+            metrics.size = len(response.content)
+        response["Server-Timing"] = metrics.server_timing()
+        if response.streaming:
+            response.streaming_content = self.measure_stream(
+                request, response, metrics, response.streaming_content
+            )
+        else:
+            registry.observe(route_name(request), metrics, response.status_code)
+        return response
+
+    def measure_stream(self, request, response, metrics, content):
+        metrics.size = 0
+        iterator = iter(content)
+        try:
+            while True:
+                # The chunks are produced outside of the request, its metrics
+                # are made current again for their queries and encoding
+                token = current_metrics.set(metrics)
+                try:
+                    chunk = next(iterator, None)
+                finally:
+                    current_metrics.reset(token)
+                if chunk is None:
+                    break
+                metrics.size += len(chunk)
+                yield chunk
+        finally:
+            metrics.finish()
+            registry.observe(route_name(request), metrics, response.status_code)
+
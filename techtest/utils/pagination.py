@@ -0,0 +1,129 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.db import models
+
+
+class PaginationError(ValueError):
+    """The pagination parameters of the request are not valid"""
+
+
+def encode_position(position):
+    """Opaque cursor holding the JSON position of a page boundary"""
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_position(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise PaginationError("Invalid cursor")
+
+
+def encode_cursor(pk, reverse=False):
+    """Opaque cursor pointing before (reverse) or after the given primary key"""
+    return encode_position({"pk": pk, "r": reverse})
+
+
+def decode_cursor(cursor):
+    position = decode_position(cursor)
+    try:
+        pk, reverse = int(position["pk"]), bool(position["r"])
+    except (ValueError, TypeError, KeyError, OverflowError):
+        raise PaginationError("Invalid cursor")
+    # The keyset queries on the primary keys the column cannot hold overflow
+    if not -(2 ** 63) <= pk < 2 ** 63:
+        raise PaginationError("Invalid cursor")
+    return pk, reverse
+
+
+class Page:
+    """A page of model instances with the cursors to its neighbours"""
+
+    def __init__(self, object_list, next_cursor=None, prev_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def link_header(self, request):
+        """The RFC 8288 ``Link`` header value pointing to the neighbour pages"""
+        links = []
+        for rel, cursor in (("next", self.next_cursor), ("prev", self.prev_cursor)):
+            if cursor is None:
+                continue
+            query = request.GET.copy()
+            query["cursor"] = cursor
+            url = request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
+            links.append(f'<{url}>; rel="{rel}"')
+        return ", ".join(links)
+
+
+class CursorPaginator:
+    """Keyset pagination on the primary key
+
+    Every page is a ``pk > cursor`` (or ``pk < cursor`` going backwards) range
+    scan on the primary key index limited to the page size, so page N costs
+    the same as the first one.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+
+    def __init__(self, page_size=None, max_page_size=None):
+        self.page_size = page_size or settings.PAGINATION_PAGE_SIZE
+        self.max_page_size = max_page_size or settings.PAGINATION_MAX_PAGE_SIZE
+
+    def get_page_size(self, request):
+        page_size = request.GET.get(self.page_size_query_param)
+        if page_size is None:
+            return min(self.page_size, self.max_page_size)
+        try:
+            page_size = int(page_size)
+        except ValueError:
+            raise PaginationError("The page size must be an integer")
+        if page_size < 1:
+            raise PaginationError("The page size must be positive")
+        return min(page_size, self.max_page_size)
+
+    def paginate(self, queryset: models.QuerySet, request):
+        """The page of the queryset the request points to
+
+        The queryset rows are model instances or ``values()`` dictionaries.
+        """
+        page_size = self.get_page_size(request)
+        cursor = request.GET.get(self.cursor_query_param)
+        queryset = queryset.order_by("pk")
+        pk_name = queryset.model._meta.pk.attname
+
+        def pk(row):
+            return row[pk_name] if isinstance(row, dict) else row.pk
+
+        if not cursor:
+            rows = list(queryset[:page_size + 1])
+            page = rows[:page_size]
+            has_more = len(rows) > page_size
+            return Page(page, next_cursor=encode_cursor(pk(page[-1])) if has_more else None)
+
+        position, reverse = decode_cursor(cursor)
+        if not reverse:
+            rows = list(queryset.filter(pk__gt=position)[:page_size + 1])
+            page = rows[:page_size]
+            has_more = len(rows) > page_size
+            return Page(
+                page,
+                next_cursor=encode_cursor(pk(page[-1])) if has_more else None,
+                prev_cursor=encode_cursor(pk(page[0]), reverse=True) if page else None,
+            )
+
+        rows = list(queryset.filter(pk__lt=position).reverse()[:page_size + 1])
+        page = rows[:page_size][::-1]
+        has_more = len(rows) > page_size
+        return Page(
+            page,
+            next_cursor=encode_cursor(pk(page[-1])) if page else None,
+            prev_cursor=encode_cursor(pk(page[0]), reverse=True) if has_more else None,
+        )
@@ -0,0 +1,120 @@
+from django.db import models
+from django.db.models import Prefetch
+from marshmallow import Schema
+
+
+def schema_model_fields(schema: Schema, model: models.Model):
+    """Names of the schema fields backed by a concrete column of the model, relations aside"""
+    columns = {field.name for field in model._meta.concrete_fields if not field.is_relation}
+    return [name for name in schema._declared_fields if name in columns]
+
+
+def plan_queryset(queryset: models.QuerySet, schema: Schema, only=None):
+    """Apply the joins and prefetches needed to serialize the queryset with the schema
+
+    The schema declares the relations it serializes in its ``Meta``:
+    ``select_related`` for the forward foreign keys and ``prefetch_related``
+    for the many-to-many relations, both mapping the relation name to the
+    nested schema. The prefetch querysets only load the nested schema fields,
+    or only the primary keys when the nested schema serializes from a cache
+    (a ``cache`` in its ``Meta``).
+
+    With ``only``, the names of the schema fields to serialize, only their
+    columns are loaded and only their relations are joined or prefetched.
+    """
+    meta = getattr(schema, "Meta", None)
+    select_related = getattr(meta, "select_related", {})
+    prefetch_related = getattr(meta, "prefetch_related", {})
+    if only is not None:
+        select_related = {name: nested for name, nested in select_related.items() if name in only}
+        prefetch_related = {
+            name: nested for name, nested in prefetch_related.items() if name in only
+        }
+        columns = [name for name in schema_model_fields(schema, queryset.model) if name in only]
+        queryset = queryset.only("pk", *columns, *select_related)
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    for name, nested_schema in prefetch_related.items():
+        related_model = queryset.model._meta.get_field(name).related_model
+        if getattr(nested_schema.Meta, "cache", None) is not None:
+            fields = ["pk"]
+        else:
+            fields = schema_model_fields(nested_schema, related_model)
+        queryset = queryset.prefetch_related(
+            Prefetch(name, queryset=related_model.objects.only(*fields))
+        )
+    return queryset
+
+
+def iter_batches(queryset: models.QuerySet, chunk_size: int):
+    """Iterate the queryset in lists of at most ``chunk_size`` instances
+
+    Plain querysets are streamed from a single ``iterator()`` cursor. As
+    ``iterator()`` ignores ``prefetch_related``, querysets with prefetches are
+    read in keyset chunks on the primary key instead, each chunk running its
+    own prefetch queries.
+    """
+    queryset = queryset.order_by("pk")
+    if not queryset._prefetch_related_lookups:
+        batch = []
+        for instance in queryset.iterator(chunk_size=chunk_size):
+            batch.append(instance)
+            if len(batch) == chunk_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+        return
+
+    batch = list(queryset[:chunk_size])
+    while batch:
+        yield batch
+        batch = list(queryset.filter(pk__gt=batch[-1].pk)[:chunk_size])
+
+
+def bulk_create_with_pks(model: models.Model, objs):
+    """``bulk_create`` the instances, making sure their primary keys are set
+
+    Must run inside a transaction. Backends that cannot return the ids of a
+    bulk insert (SQLite with Django 3.2) keep the database write lock until the
+    transaction commits, so the rows inserted without an explicit primary key
+    got the last consecutive autoincrement ids.
+    """
+    model.objects.bulk_create(objs)
+    missing = [obj for obj in objs if obj.pk is None]
+    if missing:
+        last = model.objects.order_by("-pk").values_list("pk", flat=True)[0]
+        for pk, obj in zip(range(last - len(missing) + 1, last + 1), missing):
+            obj.pk = pk
+    return objs
+
+
+def assign_changes(instance: models.Model, values):
+    """Set the values on the loaded instance, returning the names of the fields they changed
+
+    The related instances are compared by primary key.
+    """
+    changed = []
+    for name, value in values.items():
+        field = instance._meta.get_field(name)
+        if field.is_relation:
+            current, new = getattr(instance, field.attname), value.pk if value is not None else None
+        else:
+            current, new = getattr(instance, name), value
+        if current != new:
+            changed.append(name)
+        # Set even when unchanged, so the related instance is cached for the dump
+        setattr(instance, name, value)
+    return changed
+
+
+def update_instance(instance: models.Model, values):
+    """Set the values on the loaded instance and save only the fields they changed
+
+    Nothing is written, and no signal is sent, when no value changed. Returns
+    the names of the changed fields.
+    """
+    changed = assign_changes(instance, values)
+    if changed:
+        instance.save(update_fields=changed)
+    return changed
@@ -0,0 +1,154 @@
+import contextlib
+import contextvars
+import random
+import sqlite3
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.deprecation import MiddlewareMixin
+from django.views.generic import View
+
+# The replica the reads of the current request go to, None for the primary
+read_alias = contextvars.ContextVar("read_alias", default=None)
+
+PIN_COOKIE = "primary_until"
+PIN_HEADER = "X-Primary-Until"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+@contextlib.contextmanager
+def read_from_primary():
+    """Read from the primary inside the block, for the reads kept beyond the request
+
+    Like the region catalogue or the stored documents, which would keep what
+    a lagging replica read, for the clients pinned to the primary as well.
+    """
+    token = read_alias.set(None)
+    try:
+        yield
+    finally:
+        read_alias.reset(token)
+
+
+class ReplicaRouter:
+    """Send the reads of the requests served from a replica to it, everything else to the primary
+
+    The writes always go to the primary, even for the instances read from a
+    replica, and the replicas are never migrated: they are copies of the
+    primary, schema included.
+    """
+
+    def db_for_read(self, model, **hints):
+        return read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_READ_REPLICAS}
+        return obj1._state.db in aliases and obj2._state.db in aliases
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_READ_REPLICAS
+
+
+def pinned_until(request):
+    """The time until which the client reads from the primary, from its cookie or header"""
+    value = request.COOKIES.get(PIN_COOKIE) or request.headers.get(PIN_HEADER)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def choose_replica(request):
+    """The replica to serve the request from, None when it reads from the primary"""
+    if (
+        request.method not in ("GET", "HEAD")
+        or not settings.DATABASE_READ_REPLICAS
+        or pinned_until(request) > time.time()
+    ):
+        return None
+    return random.choice(settings.DATABASE_READ_REPLICAS)
+
+
+def read_from(alias, content):
+    """Iterate the streamed content, its chunks reading from the replica"""
+    iterator = iter(content)
+    while True:
+        # The chunks are produced outside of the view, the replica is made
+        # current again for their queries
+        token = read_alias.set(alias)
+        try:
+            chunk = next(iterator, None)
+        finally:
+            read_alias.reset(token)
+        if chunk is None:
+            return
+        yield chunk
+
+
+class ReplicaReadMixin(View):
+    """Serve the GET requests from one of ``DATABASE_READ_REPLICAS``
+
+    Unless the client is pinned to the primary after a write (see
+    ``PrimaryPinMiddleware``), the reads of the request are routed to a
+    replica picked at random, which is set as the ``read_alias`` of the
+    request. The mixin comes before ``ResponseCacheMixin``, which keys the
+    responses read from a replica apart.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        alias = choose_replica(request)
+        request.read_alias = alias
+        if alias is None:
+            return super().dispatch(request, *args, **kwargs)
+        token = read_alias.set(alias)
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+        finally:
+            read_alias.reset(token)
+        if response.streaming:
+            response.streaming_content = read_from(alias, response.streaming_content)
+        return response
+
+
+class PrimaryPinMiddleware(MiddlewareMixin):
+    """Pin the clients to the primary for ``DATABASE_REPLICA_LAG`` seconds after they write
+
+    The successful responses to the unsafe methods carry the time until which
+    the client reads from the primary, so it reads its own writes: in a
+    cookie, and in a header for the clients without cookies to send back.
+    """
+
+    def process_response(self, request, response):
+        if (
+            settings.DATABASE_READ_REPLICAS
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+        ):
+            until = f"{time.time() + settings.DATABASE_REPLICA_LAG:.3f}"
+            response.set_cookie(
+                PIN_COOKIE, until, max_age=settings.DATABASE_REPLICA_LAG, httponly=True, samesite="Lax"
+            )
+            response[PIN_HEADER] = until
+        return response
+
+
+def replicate_sqlite(replicas=None):
+    """Copy the primary SQLite database into the replica ones, standing in for a replication
+
+    Each copy is a consistent snapshot of the primary, taken with the SQLite
+    online backup, which the replica readers see at their next transaction.
+    """
+    primary = connections[DEFAULT_DB_ALIAS]
+    if primary.vendor != "sqlite":
+        raise ValueError(f"Cannot replicate a {primary.vendor} database, only SQLite ones")
+    primary.ensure_connection()
+    for alias in settings.DATABASE_READ_REPLICAS if replicas is None else replicas:
+        target = sqlite3.connect(connections[alias].settings_dict["NAME"])
+        try:
+            primary.connection.backup(target)
+        finally:
+            target.close()
@@ -1,8 +1,32 @@
-import json
-from django.http.response import HttpResponse
+from django.http.response import HttpResponse, StreamingHttpResponse
+
+from techtest.utils.encoders import get_encoder
+from techtest.utils.metrics import serialization_timer
 
 
 def json_response(data={}, status=200):
-    return HttpResponse(
-        content=json.dumps(data), status=status, content_type="application/json"
+    with serialization_timer():
+        content = get_encoder().dumps(data)
+    return HttpResponse(content=content, status=status, content_type="application/json")
+
+
+def iter_json_array(batches):
+    """Encode the batches of items as the chunks of a single JSON array"""
+    encoder = get_encoder()
+    yield b"["
+    separator = b""
+    for batch in batches:
+        if batch:
+            # The batch items, without the brackets of their own array
+            with serialization_timer():
+                chunk = separator + encoder.dumps(batch)[1:-1]
+            yield chunk
+            separator = b","
+    yield b"]"
+
+
+def json_stream_response(batches, status=200):
+    """Stream the batches of items as a JSON array, one chunk per batch"""
+    return StreamingHttpResponse(
+        iter_json_array(batches), status=status, content_type="application/json"
     )
@@ -0,0 +1,50 @@
+import functools
+
+from marshmallow import fields
+from marshmallow import Schema
+
+
+class CompiledSerializer:
+    """Dump function generated once for a schema, producing ``Schema().dump`` output
+
+    The fields are resolved when the schema is compiled: the integer and
+    string fields become a plain attribute read and cast, the method fields a
+    call of the method bound to a single schema instance, and any other field
+    a call of its own ``serialize``. Loading keeps going through marshmallow.
+    ``only`` restricts the output to these fields, like the schema ``only``.
+    """
+
+    casts = {fields.Integer: "int", fields.String: "str"}
+
+    def __init__(self, schema_class: Schema, only=None):
+        self.schema = schema_class(only=only)
+        namespace = {"get_attribute": self.schema.get_attribute}
+        reads, items = [], []
+        for i, (name, field) in enumerate(self.schema.dump_fields.items()):
+            key = field.data_key or name
+            attribute = field.attribute or name
+            cast = self.casts.get(type(field))
+            if isinstance(field, fields.Method):
+                namespace[f"method_{i}"] = getattr(self.schema, field.serialize_method_name)
+                value = f"method_{i}(obj)"
+            elif cast and attribute.isidentifier() and not getattr(field, "as_string", False):
+                reads.append(f"    value_{i} = obj.{attribute}")
+                value = f"None if value_{i} is None else {cast}(value_{i})"
+            else:
+                namespace[f"field_{i}"] = field
+                value = f"field_{i}.serialize({attribute!r}, obj, get_attribute)"
+            items.append(f"        {key!r}: {value},")
+        source = "\n".join(["def dump(obj):", *reads, "    return {", *items, "    }"])
+        exec(compile(source, f"<serializer of {schema_class.__name__}>", "exec"), namespace)
+        self.dump = namespace["dump"]
+        self.source = source
+
+    def dump_many(self, objs):
+        dump = self.dump
+        return [dump(obj) for obj in objs]
+
+
+@functools.lru_cache(maxsize=None)
+def get_serializer(schema_class: Schema, only=None):
+    """The compiled serializer of the schema, or of these of its fields, compiled on first use"""
+    return CompiledSerializer(schema_class, only)
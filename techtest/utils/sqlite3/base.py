@@ -0,0 +1,40 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = ("DEFERRED", "IMMEDIATE", "EXCLUSIVE")
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """The SQLite backend, with the ``init_command`` and ``transaction_mode`` options of Django 5.1
+
+    ``init_command`` holds the statements run on every new connection, the
+    pragmas, separated by semicolons. ``transaction_mode`` is the mode of the
+    transactions ``atomic`` begins: a deferred transaction takes the write
+    lock at its first write, and fails at once with "database is locked" when
+    another connection wrote since its first read, where an ``IMMEDIATE`` one
+    takes the lock upfront and waits for it up to the busy ``timeout``.
+    """
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop("init_command", None)
+        params.pop("transaction_mode", None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        init_command = self.settings_dict["OPTIONS"].get("init_command", "")
+        for statement in init_command.split(";"):
+            if statement.strip():
+                conn.execute(statement)
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict["OPTIONS"].get("transaction_mode")
+        if mode is None:
+            return super()._start_transaction_under_autocommit()
+        if mode.upper() not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f"transaction_mode must be one of {', '.join(TRANSACTION_MODES)}, not {mode!r}"
+            )
+        self.cursor().execute(f"BEGIN {mode.upper()}")
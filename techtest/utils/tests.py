@@ -0,0 +1,555 @@
+import datetime
+import decimal
+import gzip
+import json
+import os
+import tempfile
+import unittest
+import uuid
+import zlib
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, connections
+from django.test import AsyncClient, AsyncRequestFactory, Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.functional import lazystr
+from marshmallow import fields
+from marshmallow import Schema
+
+from techtest.article.documents import refresh_documents
+from techtest.article.models import Article, ArticleDocument
+from techtest.article.schemas import ArticleSchema
+from techtest.author.models import Author
+from techtest.author.schemas import AuthorSchema
+from techtest.region.cache import region_cache
+from techtest.region.models import Region
+from techtest.region.schemas import RegionSchema
+from techtest.utils import compression, database
+from techtest.utils.async_views import (
+    AsyncListRetreiveAbstractView,
+    AsyncSinglePKInstanceAbstractView,
+    AsyncSinglePostAbstractView,
+)
+from techtest.utils.cache import get_cache
+from techtest.utils.compression import brotli, negotiate_encoding
+from techtest.utils.metrics import registry
+from techtest.utils.encoders import OrjsonEncoder, StdlibJSONEncoder, get_encoder, orjson
+from techtest.utils.queryset import plan_queryset
+from techtest.utils.replicas import PIN_COOKIE, PIN_HEADER, ReplicaRouter, read_alias, replicate_sqlite
+from techtest.utils.response import json_response, json_stream_response
+from techtest.utils.serializers import CompiledSerializer, get_serializer
+from techtest.utils.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+from techtest.utils.values import ValuesSerializer
+
+
+class CompiledSerializerTestCase(TestCase):
+    def setUp(self):
+        self.author = Author.objects.create(first_name="First name", last_name="Last Name")
+        self.region_1 = Region.objects.create(code="AL", name="Albania")
+        self.region_2 = Region.objects.create(code="UK", name="United Kingdom")
+        Article.objects.create(title="Fake Article 1")
+        article = Article.objects.create(
+            title="Fake Article 2", content="Lorem Ipsum", author=self.author
+        )
+        article.regions.set([self.region_1, self.region_2])
+
+    def assertParity(self, schema_class, queryset):
+        objs = list(plan_queryset(queryset, schema_class))
+        self.assertEqual(
+            get_serializer(schema_class).dump_many(objs),
+            schema_class().dump(objs, many=True),
+        )
+
+    def test_dumps_like_marshmallow(self):
+        self.assertParity(ArticleSchema, Article.objects.all())
+        self.assertParity(AuthorSchema, Author.objects.all())
+        self.assertParity(RegionSchema, Region.objects.all())
+
+    def test_falls_back_to_the_field_serialization(self):
+        class EventSchema(Schema):
+            id = fields.Integer(as_string=True)
+            label = fields.String(attribute="name", data_key="title")
+            at = fields.DateTime()
+            code = fields.String()
+
+        class Event:
+            id = 1
+            name = "Release"
+            at = datetime.datetime(2022, 2, 1, 21, 51)
+            code = None
+
+        serializer = CompiledSerializer(EventSchema)
+        self.assertEqual(serializer.dump(Event()), EventSchema().dump(Event()))
+        self.assertEqual(
+            serializer.dump(Event()),
+            {"id": "1", "title": "Release", "at": "2022-02-01T21:51:00", "code": None},
+        )
+
+    def test_dumps_only_the_selected_fields(self):
+        objs = list(plan_queryset(Article.objects.all(), ArticleSchema, ("title", "author")))
+        self.assertEqual(
+            get_serializer(ArticleSchema, ("title", "author")).dump_many(objs),
+            ArticleSchema(only=("title", "author")).dump(objs, many=True),
+        )
+
+    def test_compiles_once_per_schema(self):
+        self.assertIs(get_serializer(ArticleSchema), get_serializer(ArticleSchema))
+
+
+class ValuesSerializerTestCase(TestCase):
+    def setUp(self):
+        author = Author.objects.create(first_name="First name", last_name="Last Name")
+        regions = [
+            Region.objects.create(code="AL", name="Albania"),
+            Region.objects.create(code="UK", name="United Kingdom"),
+        ]
+        Article.objects.create(title="Fake Article 1")
+        Article.objects.create(title="Fake Article 2", author=author).regions.set(regions)
+
+    def test_reads_uncached_relations_in_bulk(self):
+        class UncachedRegionSchema(Schema):
+            id = fields.Integer()
+            code = fields.String()
+
+        class UncachedArticleSchema(Schema):
+            class Meta:
+                select_related = {"author": AuthorSchema}
+                prefetch_related = {"regions": UncachedRegionSchema}
+
+            id = fields.Integer()
+            title = fields.String()
+            author = fields.Raw()
+            regions = fields.Raw()
+
+        serializer = ValuesSerializer(UncachedArticleSchema, Article)
+        # The articles with their authors, the region links, and the regions
+        with self.assertNumQueries(3):
+            dumped = serializer.dump_many(serializer.values(Article.objects.order_by("pk")))
+        self.assertEqual(dumped[0], {
+            "id": dumped[0]["id"], "title": "Fake Article 1", "author": None, "regions": [],
+        })
+        self.assertEqual(dumped[1]["author"]["first_name"], "First name")
+        self.assertEqual([region["code"] for region in dumped[1]["regions"]], ["AL", "UK"])
+        self.assertEqual(set(dumped[1]["regions"][0]), {"id", "code"})
+
+    def test_rejects_fields_needing_serialization(self):
+        class EventSchema(Schema):
+            id = fields.Integer()
+            title = fields.DateTime()
+
+        with self.assertRaises(ImproperlyConfigured):
+            ValuesSerializer(EventSchema, Article)
+
+
+class JSONEncoderTestCase(TestCase):
+    encoders = [StdlibJSONEncoder] + ([OrjsonEncoder] if orjson is not None else [])
+    data = {
+        "id": 1,
+        "title": "Fake Article 1",
+        "regions": [{"code": "AL", "name": None}],
+        "at": datetime.datetime(2022, 2, 1, 21, 51, 0, 123456, tzinfo=datetime.timezone.utc),
+        "day": datetime.date(2022, 2, 1),
+        "price": decimal.Decimal("1.50"),
+        "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "label": lazystr("Lazy"),
+        1: "integer key",
+    }
+
+    def test_encoders_produce_the_same_documents(self):
+        expected = {
+            "id": 1,
+            "title": "Fake Article 1",
+            "regions": [{"code": "AL", "name": None}],
+            "at": "2022-02-01T21:51:00.123Z",
+            "day": "2022-02-01",
+            "price": "1.50",
+            "uuid": "12345678-1234-5678-1234-567812345678",
+            "label": "Lazy",
+            "1": "integer key",
+        }
+        for encoder in self.encoders:
+            with self.subTest(encoder=encoder.__name__):
+                self.assertEqual(json.loads(encoder().dumps(self.data)), expected)
+
+    def test_rejects_unknown_types(self):
+        for encoder in self.encoders:
+            with self.subTest(encoder=encoder.__name__):
+                with self.assertRaises(TypeError):
+                    encoder().dumps({"value": object()})
+
+    def test_responses_use_the_configured_encoder(self):
+        self.assertIsInstance(get_encoder(), self.encoders[-1])
+        with override_settings(JSON_ENCODER="techtest.utils.encoders.StdlibJSONEncoder"):
+            self.assertIsInstance(get_encoder(), StdlibJSONEncoder)
+            self.assertEqual(json_response({"id": 1}).content, b'{"id": 1}')
+
+    def test_streams_the_batches_as_one_array(self):
+        for encoder in self.encoders:
+            path = f"techtest.utils.encoders.{encoder.__name__}"
+            with self.subTest(encoder=encoder.__name__), override_settings(JSON_ENCODER=path):
+                response = json_stream_response([[{"id": 1}, {"id": 2}], [], [{"id": 3}]])
+                self.assertEqual(
+                    json.loads(b"".join(response.streaming_content)),
+                    [{"id": 1}, {"id": 2}, {"id": 3}],
+                )
+
+
+class MetricsMiddlewareTestCase(TestCase):
+    def setUp(self):
+        registry.reset()
+        region = Region.objects.create(code="AL", name="Albania")
+        for i in range(3):
+            Article.objects.create(title=f"Fake Article {i}", content="Lorem Ipsum").regions.add(region)
+
+    def test_reports_server_timing(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("articles-list"))
+        timing = response["Server-Timing"]
+        self.assertIn("app;dur=", timing)
+        self.assertIn(f'desc="{len(queries)} queries"', timing)
+        self.assertIn("serialize;dur=", timing)
+        self.assertIn(f'size;desc="{len(response.content)} bytes"', timing)
+
+    def test_aggregates_by_url_name(self):
+        sizes = [
+            len(self.client.get(reverse("articles-list")).content),
+            len(self.client.get(reverse("articles-list"), {"title_prefix": "Fake"}).content),
+        ]
+        self.client.get(reverse("article", args=[Article.objects.first().pk]))
+        self.client.get("/missing/")
+
+        metrics = self.client.get(reverse("metrics")).json()
+        self.assertEqual(metrics["region_cache"], region_cache.stats())
+        routes = metrics["routes"]
+        self.assertEqual(set(routes), {"articles-list", "article", "unmatched"})
+        articles = routes["articles-list"]
+        self.assertEqual(articles["duration_ms"]["count"], 2)
+        self.assertEqual(articles["duration_ms"]["buckets"]["+Inf"], 2)
+        self.assertEqual(articles["size_bytes"]["sum"], sum(sizes))
+        self.assertGreater(articles["queries"]["sum"], 0)
+        self.assertEqual(articles["errors"], 0)
+        self.assertEqual(routes["article"]["duration_ms"]["count"], 1)
+
+    def test_measures_streamed_responses(self):
+        response = self.client.get(reverse("articles-list"), {"stream": "true"})
+        self.assertNotIn("articles-list", registry.as_dict())
+        content = b"".join(response.streaming_content)
+
+        articles = registry.as_dict()["articles-list"]
+        self.assertEqual(articles["size_bytes"]["sum"], len(content))
+        self.assertGreater(articles["queries"]["sum"], 0)
+        self.assertGreater(articles["serialize_ms"]["sum"], 0)
+
+    # The test database is only visible from the thread of the test transaction
+    @override_settings(ROOT_URLCONF="techtest.asgi_urls", ASYNC_VIEWS_THREAD_SENSITIVE=True)
+    async def test_counts_the_queries_of_async_views(self):
+        response = await AsyncClient().get(reverse("articles-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('desc="0 queries"', response["Server-Timing"])
+
+
+# The test database is only visible from the thread of the test transaction
+@override_settings(ASYNC_VIEWS_THREAD_SENSITIVE=True)
+class AsyncAbstractViewsTestCase(TestCase):
+    def setUp(self):
+        self.region = Region.objects.create(code="AL", name="Albania")
+        self.factory = AsyncRequestFactory()
+
+    async def test_serves_the_abstract_views_from_coroutines(self):
+        class ListView(AsyncListRetreiveAbstractView):
+            model = Region
+            model_schema = RegionSchema
+
+        class InstanceView(AsyncSinglePKInstanceAbstractView):
+            model = Region
+            model_schema = RegionSchema
+
+        class PostView(AsyncSinglePostAbstractView):
+            model_schema = RegionSchema
+
+        response = await ListView.as_view()(self.factory.get("/"))
+        self.assertEqual(json.loads(response.content)[0]["code"], "AL")
+
+        response = await InstanceView.as_view()(self.factory.get("/"), pk=self.region.pk)
+        self.assertEqual(json.loads(response.content)["name"], "Albania")
+
+        response = await PostView.as_view()(
+            self.factory.post(
+                "/", json.dumps({"code": "UK", "name": "United Kingdom"}), content_type="application/json"
+            )
+        )
+        self.assertEqual(response.status_code, 201)
+
+
+class CompressionMiddlewareTestCase(TestCase):
+    def setUp(self):
+        region = Region.objects.create(code="AL", name="Albania")
+        for i in range(20):
+            Article.objects.create(title=f"Fake Article {i}", content="Lorem Ipsum " * 20).regions.add(region)
+        self.url = reverse("articles-list")
+        self.content = self.client.get(self.url).content
+
+    def test_negotiates_the_encoding(self):
+        self.assertEqual(negotiate_encoding("gzip, deflate"), "gzip")
+        self.assertEqual(negotiate_encoding("deflate"), None)
+        self.assertEqual(negotiate_encoding("gzip;q=0, *"), "br" if brotli else None)
+        self.assertEqual(negotiate_encoding("GZIP;q=0.5, identity"), "gzip")
+        self.assertEqual(negotiate_encoding("*"), "br" if brotli else "gzip")
+        self.assertEqual(negotiate_encoding(""), None)
+
+    def test_compresses_json_responses(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertTrue(response["ETag"].startswith('W/"'))
+        self.assertEqual(int(response["Content-Length"]), len(response.content))
+        self.assertLess(len(response.content), len(self.content))
+        self.assertEqual(gzip.decompress(response.content), self.content)
+
+    def test_sends_small_or_unaccepted_responses_as_they_are(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="identity")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(response.content, self.content)
+
+        with override_settings(COMPRESSION_MIN_SIZE=len(self.content) + 1):
+            response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, self.content)
+
+    def test_compresses_streamed_responses(self):
+        streamed = b"".join(self.client.get(self.url, {"stream": "true"}).streaming_content)
+        response = self.client.get(self.url, {"stream": "true"}, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertFalse(response.has_header("Content-Length"))
+        decompressor = zlib.decompressobj(31)
+        *chunks, trailer = response.streaming_content
+        # Every chunk decompresses on its own, the client is not kept waiting
+        for chunk in chunks:
+            self.assertTrue(decompressor.decompress(chunk))
+        decompressor.decompress(trailer)
+        self.assertTrue(decompressor.eof)
+
+        response = self.client.get(self.url, {"stream": "true"}, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), streamed)
+
+    def test_reuses_the_compressed_cached_bodies(self):
+        with mock.patch.object(compression, "compress", wraps=compression.compress) as compress:
+            first = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+            second = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+            self.assertEqual(compress.call_count, 1)
+            self.assertEqual(first.content, second.content)
+
+            Article.objects.create(title="New Article", content="Lorem Ipsum " * 20)
+            response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+            self.assertEqual(compress.call_count, 2)
+        self.assertIn(b"New Article", gzip.decompress(response.content))
+
+    def test_answers_weak_etags_with_not_modified(self):
+        etag = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")["ETag"]
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    @unittest.skipIf(brotli is None, "The brotli package is not installed")
+    def test_prefers_brotli(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(response.content), self.content)
+
+
+def sqlite_connection(test_case, **options):
+    """A connection of the SQLite backend to a temporary file, with these OPTIONS"""
+    directory = tempfile.TemporaryDirectory()
+    test_case.addCleanup(directory.cleanup)
+    settings_dict = dict(
+        connection.settings_dict,
+        ENGINE="techtest.utils.sqlite3",
+        NAME=os.path.join(directory.name, "db.sqlite3"),
+        OPTIONS={"timeout": 1, **options},
+    )
+    wrapper = SQLiteDatabaseWrapper(settings_dict, alias="sqlite_backend_test")
+    test_case.addCleanup(wrapper.close)
+    return wrapper
+
+
+class SQLiteBackendTestCase(TestCase):
+    def connect(self, **options):
+        return sqlite_connection(self, **options)
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_applies_the_init_command_on_connect(self):
+        wrapper = self.connect(init_command="PRAGMA journal_mode = WAL; PRAGMA cache_size = -1000")
+        self.assertEqual(self.pragma(wrapper, "journal_mode"), "wal")
+        self.assertEqual(self.pragma(wrapper, "cache_size"), -1000)
+        self.assertEqual(self.pragma(wrapper, "foreign_keys"), 1)
+
+    def begin(self, wrapper):
+        """The statement starting a transaction, as atomic() starts it on SQLite"""
+        statements = []
+
+        def record(execute, sql, params, many, context):
+            statements.append(sql)
+            return execute(sql, params, many, context)
+
+        with wrapper.execute_wrapper(record):
+            wrapper.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+        wrapper.rollback()
+        wrapper.set_autocommit(True)
+        return statements[0]
+
+    def test_begins_transactions_in_the_transaction_mode(self):
+        self.assertEqual(self.begin(self.connect()), "BEGIN")
+        self.assertEqual(self.begin(self.connect(transaction_mode="immediate")), "BEGIN IMMEDIATE")
+        with self.assertRaises(ImproperlyConfigured):
+            self.begin(self.connect(transaction_mode="LAZY"))
+
+
+class HealthCheckTestCase(TestCase):
+    def test_closes_the_unusable_connections(self):
+        wrapper = sqlite_connection(self)
+        wrapper.ensure_connection()
+        with mock.patch.object(database, "connections", mock.Mock(all=lambda: [wrapper])):
+            database.check_connections()
+            self.assertIsNotNone(wrapper.connection)
+            with mock.patch.object(wrapper, "is_usable", return_value=False):
+                with override_settings(DATABASE_HEALTH_CHECKS=False):
+                    database.check_connections()
+                self.assertIsNotNone(wrapper.connection)
+                with override_settings(DATABASE_HEALTH_CHECKS=True):
+                    database.check_connections()
+                self.assertIsNone(wrapper.connection)
+
+
+@override_settings(DATABASE_READ_REPLICAS=["replica_test"], DATABASE_REPLICA_LAG=5)
+class ReplicaRoutingTestCase(TransactionTestCase):
+    """Reads from a replica SQLite file, copied from the primary by the stand-in replication"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Added once the test databases are set up, as a file of its own
+        cls.directory = tempfile.TemporaryDirectory()
+        connections.settings["replica_test"] = dict(
+            connections["default"].settings_dict,
+            NAME=os.path.join(cls.directory.name, "replica.sqlite3"),
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        connections["replica_test"].close()
+        del connections["replica_test"]
+        del connections.settings["replica_test"]
+        cls.directory.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        get_cache().clear()
+        Author.objects.create(first_name="Replicated", last_name="Author")
+        replicate_sqlite()
+        # Written after the replication, only on the primary
+        Author.objects.create(first_name="Primary", last_name="Author")
+
+    def first_names(self, response):
+        return sorted(author["first_name"] for author in response.json())
+
+    def test_reads_the_lists_from_the_replica(self):
+        response = self.client.get(reverse("author-list"))
+        self.assertEqual(self.first_names(response), ["Replicated"])
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_streams_the_lists_from_the_replica(self):
+        response = self.client.get(reverse("author-list"), {"stream": "true"})
+        self.assertTrue(response.streaming)
+        authors = json.loads(b"".join(response.streaming_content))
+        self.assertEqual([author["first_name"] for author in authors], ["Replicated"])
+
+    def test_pins_the_writer_to_the_primary(self):
+        response = self.client.post(
+            reverse("author-list"),
+            data={"first_name": "Written", "last_name": "Author"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertEqual(response.cookies[PIN_COOKIE]["max-age"], 5)
+        # The test client sends the cookie back
+        response = self.client.get(reverse("author-list"))
+        self.assertEqual(self.first_names(response), ["Primary", "Replicated", "Written"])
+
+    def test_pins_to_the_primary_from_the_header(self):
+        response = self.client.post(
+            reverse("author-list"),
+            data={"first_name": "Written", "last_name": "Author"},
+            content_type="application/json",
+        )
+        self.client.cookies.clear()
+        until = response[PIN_HEADER]
+        response = self.client.get(reverse("author-list"), HTTP_X_PRIMARY_UNTIL=until)
+        self.assertEqual(self.first_names(response), ["Primary", "Replicated", "Written"])
+        # An expired pin reads from the replica again
+        response = self.client.get(reverse("author-list"), HTTP_X_PRIMARY_UNTIL="1")
+        self.assertEqual(self.first_names(response), ["Replicated"])
+
+    def test_does_not_pin_on_failed_writes(self):
+        response = self.client.post(
+            reverse("author-list"), data={"first_name": 1}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_does_not_share_cached_responses_with_the_primary_readers(self):
+        self.client.get(reverse("author-list"))
+        response = self.client.get(reverse("author-list"), HTTP_X_PRIMARY_UNTIL="9999999999")
+        self.assertEqual(self.first_names(response), ["Primary", "Replicated"])
+
+    def test_writes_to_the_primary_what_was_read_from_the_replica(self):
+        token = read_alias.set("replica_test")
+        try:
+            author = Author.objects.get(first_name="Replicated")
+        finally:
+            read_alias.reset(token)
+        self.assertEqual(author._state.db, "replica_test")
+        author.last_name = "Updated"
+        author.save()
+        self.assertEqual(Author.objects.using("default").get(pk=author.pk).last_name, "Updated")
+        self.assertEqual(Author.objects.using("replica_test").get(pk=author.pk).last_name, "Author")
+
+    def test_keeps_the_region_catalogue_of_the_primary(self):
+        region = Region.objects.create(code="AL", name="Albania")
+        Article.objects.create(title="Fake Article 1").regions.set([region])
+        replicate_sqlite()
+        self.client.put(
+            reverse("region", kwargs={"region_id": region.id}),
+            data={"code": "AL", "name": "Republic of Albania"},
+            content_type="application/json",
+        )
+        # Another client, reading the articles from the lagging replica,
+        # reloads the catalogue
+        response = Client().get(reverse("articles-list"))
+        self.assertEqual(response.json()[0]["regions"][0]["name"], "Republic of Albania")
+        response = self.client.get(reverse("articles-list"))
+        self.assertEqual(response.json()[0]["regions"][0]["name"], "Republic of Albania")
+
+    @override_settings(ARTICLE_DOCUMENTS_ENABLED=True)
+    def test_renders_the_stored_documents_from_the_primary(self):
+        article = Article.objects.create(title="Fake Article 1")
+        replicate_sqlite()
+        Article.objects.filter(pk=article.pk).update(title="Written on the primary")
+        token = read_alias.set("replica_test")
+        try:
+            refresh_documents([article.pk])
+        finally:
+            read_alias.reset(token)
+        document = ArticleDocument.objects.using("default").get(pk=article.pk).document
+        self.assertEqual(json.loads(document)["title"], "Written on the primary")
+
+    def test_does_not_migrate_the_replicas(self):
+        router = ReplicaRouter()
+        self.assertTrue(router.allow_migrate("default", "author"))
+        self.assertFalse(router.allow_migrate("replica_test", "author"))
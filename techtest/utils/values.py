@@ -0,0 +1,123 @@
+import functools
+
+from django.core.exceptions import ImproperlyConfigured
+from marshmallow import fields
+from marshmallow import Schema
+
+from techtest.utils.queryset import schema_model_fields
+
+
+class ValuesSerializer:
+    """Read-only serialization of a schema from ``values()`` rows
+
+    The rows are read with ``values()`` instead of hydrating model instances:
+    the schema columns and the columns of the ``select_related`` relations
+    (through their joins) in one query, and the ``prefetch_related`` links
+    with a single query on their through table, the related rows then coming
+    from the nested schema cache, or else from a single ``values()`` query.
+
+    Only the schemas made of integer and string columns, and of the declared
+    relations, can be serialized this way: the column values are their own
+    serialized form. ``only`` restricts the output, and the rows read, to
+    these fields. The primary key is read in any case. Without ``use_cache``,
+    the related rows are always read from the database, for the output that
+    outlives the nested schema cache.
+    """
+
+    plain_fields = (fields.Integer, fields.String)
+
+    def __init__(self, schema_class: Schema, model, only=None, use_cache=True):
+        self.model = model
+        self.use_cache = use_cache
+        self.pk = model._meta.pk.attname
+        schema = schema_class(only=only)
+        meta = getattr(schema_class, "Meta", None)
+        self.foreign = {
+            name: schema_model_fields(nested, model._meta.get_field(name).related_model)
+            for name, nested in getattr(meta, "select_related", {}).items()
+            if name in schema.dump_fields
+        }
+        self.many = {
+            name: nested
+            for name, nested in getattr(meta, "prefetch_related", {}).items()
+            if name in schema.dump_fields
+        }
+        columns = schema_model_fields(schema_class, model)
+        self.columns = [self.pk] + [
+            name for name in columns if name in schema.dump_fields and name != self.pk
+        ]
+        self.keys = []
+        for name, field in schema.dump_fields.items():
+            if name in columns:
+                if type(field) not in self.plain_fields or field.attribute or field.data_key:
+                    raise ImproperlyConfigured(
+                        f"{schema_class.__name__}.{name} cannot be read from values()"
+                    )
+            elif name not in self.foreign and name not in self.many:
+                raise ImproperlyConfigured(
+                    f"{schema_class.__name__}.{name} is neither a column nor a declared relation"
+                )
+            self.keys.append(name)
+
+    def values(self, queryset):
+        """The rows of the queryset, with the columns of the joined relations"""
+        return queryset.select_related(None).prefetch_related(None).values(
+            *self.columns,
+            *(f"{name}__{column}" for name, columns in self.foreign.items() for column in columns),
+        )
+
+    def dump_many(self, rows):
+        rows = list(rows)
+        related = {name: self.fetch_many(name, rows) for name in self.many}
+        dumped = []
+        for row in rows:
+            item = {}
+            for key in self.keys:
+                if key in self.foreign:
+                    item[key] = self.nested(key, row)
+                elif key in related:
+                    item[key] = related[key].get(row[self.pk], [])
+                else:
+                    item[key] = row[key]
+            dumped.append(item)
+        return dumped
+
+    def nested(self, name, row):
+        related_pk = self.model._meta.get_field(name).related_model._meta.pk.attname
+        if row[f"{name}__{related_pk}"] is None:
+            return None
+        return {column: row[f"{name}__{column}"] for column in self.foreign[name]}
+
+    def fetch_many(self, name, rows):
+        """The serialized related rows of each row, with one query on the through table"""
+        field = self.model._meta.get_field(name)
+        through = field.remote_field.through
+        source, target = field.m2m_column_name(), field.m2m_reverse_name()
+        links = through.objects.filter(
+            **{f"{source}__in": [row[self.pk] for row in rows]}
+        ).values_list(source, target).order_by(source, target)
+
+        targets = {}
+        for row_pk, target_pk in links:
+            targets.setdefault(row_pk, []).append(target_pk)
+        nested = self.many[name]
+        cache = getattr(nested.Meta, "cache", None) if self.use_cache else None
+        if cache is not None:
+            return {row_pk: cache.dump(pks) for row_pk, pks in targets.items()}
+        related_model = field.related_model
+        related = {
+            values[related_model._meta.pk.attname]: values
+            for values in related_model.objects.filter(
+                pk__in={target_pk for pks in targets.values() for target_pk in pks}
+            ).values(*schema_model_fields(nested, related_model))
+        }
+        return {
+            row_pk: [related[target_pk] for target_pk in pks]
+            for row_pk, pks in targets.items()
+        }
+
+
+@functools.lru_cache(maxsize=None)
+def get_values_serializer(schema_class: Schema, model, only=None, use_cache=True):
+    """The values serializer of the schema, or of these of its fields, for the model, built on first use"""
+    return ValuesSerializer(schema_class, model, only, use_cache)
@@ -1,28 +1,101 @@
 import json
 
 from marshmallow import ValidationError, Schema
+from django.conf import settings
 from django.views.generic import View
 from django.db import models
 
-from techtest.utils import json_response
+from techtest.region.cache import region_cache
+from techtest.utils import json_response, json_stream_response
+from techtest.utils.fieldsets import FieldsetError, requested_fields
+from techtest.utils.cache import response_cache
+from techtest.utils.filters import FilterError, filter_queryset
+from techtest.utils.metrics import registry
+from techtest.utils.pagination import CursorPaginator, PaginationError
+from techtest.utils.queryset import iter_batches, plan_queryset
+from techtest.utils.serializers import get_serializer
+from techtest.utils.values import get_values_serializer
 
-class ListRetreiveAbstractView(View):
+
+class FieldsetMixin:
+    """Serialize the schema fields selected by the ``fields`` and ``expand`` query parameters"""
+
+    def get_fieldset(self):
+        """The names of the schema fields the request selects, None for all"""
+        if not hasattr(self, "fieldset"):
+            self.fieldset = requested_fields(self.model_schema, self.request.GET)
+        return self.fieldset
+
+
+class ListRetreiveAbstractView(FieldsetMixin, View):
     """The abstract class to retrieve a list of model instances values""" 
 
     model: models.Model = None
     queryset: models.QuerySet = None
     model_schema: Schema = None
-
-    def __init__(self):
+    page_size: int = None
+    max_page_size: int = None
+    stream_chunk_size: int = None
+    # Read the lists with values() rather than model instances
+    use_values: bool = False
+    # The techtest.utils.filters filters of the lists
+    filters = ()
+
+    def __init__(self, **kwargs):
         if self.model is None and self.queryset is None:
             raise NotImplementedError("The model and queryset are not defined")
         if self.model_schema is None:
             raise NotImplementedError("The model schema is not defined")
+        super().__init__(**kwargs)
+
+    def get_queryset(self):
+        """The queryset with the relations of the model schema loaded in bulk"""
+        qs = self.queryset if self.queryset is not None else self.model.objects.all()
+        return plan_queryset(qs.all(), self.model_schema, self.get_fieldset())
+
+    def get_list_serializer(self):
+        if self.use_values:
+            return get_values_serializer(
+                self.model_schema, self.get_queryset().model, self.get_fieldset()
+            )
+        return get_serializer(self.model_schema, self.get_fieldset())
+
+    def get_list_queryset(self):
+        """The queryset of the list, filtered by the query parameters"""
+        queryset = filter_queryset(self.get_queryset(), self.filters, self.request.GET)
+        if self.use_values:
+            return self.get_list_serializer().values(queryset)
+        return queryset
 
     def get(self, request, *args, **kwargs):
-        """Retrieve the list of model instances"""
-        qs = self.queryset or self.model.objects.all()
-        return json_response(self.model_schema().dump(self.model.objects.all(), many=True))
+        """Retrieve a page of the list of model instances"""
+        try:
+            queryset = self.get_list_queryset()
+        except (FieldsetError, FilterError) as e:
+            return json_response({"error": str(e)}, 400)
+        if request.GET.get("stream") in ("1", "true"):
+            return self.stream(queryset)
+        paginator = CursorPaginator(self.page_size, self.max_page_size)
+        try:
+            page = paginator.paginate(queryset, request)
+        except PaginationError as e:
+            return json_response({"error": str(e)}, 400)
+        response = self.page_response(page)
+        link = page.link_header(request)
+        if link:
+            response["Link"] = link
+        return response
+
+    def page_response(self, page):
+        return json_response(self.get_list_serializer().dump_many(page.object_list))
+
+    def stream(self, queryset):
+        """Stream the whole list of model instances, serialized chunk by chunk"""
+        serializer = self.get_list_serializer()
+        chunk_size = self.stream_chunk_size or settings.STREAM_CHUNK_SIZE
+        return json_stream_response(
+            serializer.dump_many(batch) for batch in iter_batches(queryset, chunk_size)
+        )
 
 
 class SinglePostAbstractView(View):
@@ -36,33 +109,66 @@ class SinglePostAbstractView(View):
             instance = self.model_schema().load(json.loads(request.body))
         except ValidationError as e:
             return json_response(e.messages, 400)
-        return json_response(self.model_schema().dump(instance), 201)
+        return json_response(get_serializer(self.model_schema).dump(instance), 201)
 
 
-class SinglePKInstanceAbstractView(View):
+class SinglePKInstanceAbstractView(FieldsetMixin, View):
     """The abstract view class to work with instances by their primary key"""
 
     model = models.Model
     model_schema: Schema = None
-    
-    def dispatch(self, request, pk, *args, **kwargs):
+    pk_url_kwarg = "pk"
+
+    def get_queryset(self):
+        """The queryset with the relations of the model schema loaded in bulk"""
+        return plan_queryset(self.model.objects.all(), self.model_schema, self.get_fieldset())
+
+    def dispatch(self, request, *args, **kwargs):
+        pk = kwargs.pop(self.pk_url_kwarg)
         try:
-            self.instance = self.model.objects.get(pk=pk)  # What is to be done with this?
+            self.instance = self.get_queryset().get(pk=pk)
+        except FieldsetError as e:
+            return json_response({"error": str(e)}, 400)
         except self.model.DoesNotExist:
-            return json_response({"error": f"No {self.model.__class__.__name__} matches the given query"}, 404)
+            return json_response({"error": f"No {self.model.__name__} matches the given query"}, 404)
         self.data = request.body and dict(json.loads(request.body), id=self.instance.id)
         return super().dispatch(request, *args, **kwargs)
 
+    def get_serializer(self):
+        return get_serializer(self.model_schema, self.get_fieldset())
+
     def get(self, request, *args, **kwargs):
-        return json_response(self.model_schema().dump(self.instance))
+        return json_response(self.get_serializer().dump(self.instance))
 
     def put(self, request, *args, **kwargs):
+        """Update the loaded instance in place, writing only the changed fields"""
+        return self.update()
+
+    def patch(self, request, *args, **kwargs):
+        """Update the fields sent of the loaded instance in place, writing only the changed ones"""
+        return self.update(partial=True)
+
+    def update(self, partial=False):
         try:
-            self.instance = self.model_schema().load(self.data)
+            self.instance = self.model_schema(context={"instance": self.instance}).load(
+                self.data, partial=partial
+            )
         except ValidationError as e:
             return json_response(e.messages, 400)
-        return json_response(self.model_schema().dump(self.instance))
+        return json_response(self.get_serializer().dump(self.instance))
 
     def delete(self, request, *args, **kwargs):
         self.instance.delete()
         return json_response()
+
+
+class MetricsView(View):
+    def get(self, request, *args, **kwargs):
+        """The request metrics of this process by URL name, and the response and region caches counters"""
+        return json_response(
+            {
+                "routes": registry.as_dict(),
+                "response_cache": response_cache.stats(),
+                "region_cache": region_cache.stats(),
+            }
+        )